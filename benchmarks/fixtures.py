@@ -0,0 +1,195 @@
+"""
+Synthetic, deterministic inputs for the benchmarks.
+
+Nothing here depends on real media files or network access. MediaInfo output is generated
+as OLDXML, the format pynfogen caches, and remote responses are generated for the stand-in server.
+"""
+import json
+from typing import Dict, List
+from xml.sax.saxutils import escape
+
+IMDB_ID = "tt0487831"
+TVDB_ID = 79216
+PREVIEW_URL = "https://imgbox.com/g/Benchmark"
+
+LANGUAGES = ("en", "es", "fr", "de", "it", "ja", "pt", "nl")
+
+
+def _track(kind: str, fields: Dict[str, object]) -> str:
+    """Get an OLDXML track element, repeated values are given as lists like MediaInfo's own output."""
+    elements = []
+    for name, value in fields.items():
+        for v in (value if isinstance(value, list) else [value]):
+            elements.append(f"<{name}>{escape(str(v))}</{name}>")
+    return f'<track type="{kind}">{"".join(elements)}</track>'
+
+
+def media_info_xml(audio_tracks: int = 3, subtitle_tracks: int = 8, chapters: int = 12) -> str:
+    """Get synthetic MediaInfo OLDXML of a 1080p HDR10 HEVC release with the given amount of tracks."""
+    tracks = [
+        _track("General", {
+            "Complete_name": "Benchmark.2006.1080p.BluRay.mkv",
+            "Format": "Matroska",
+            "Duration": [6120000, "1 h 42 min"],
+            "IMDB": IMDB_ID,
+            "TVDB": TVDB_ID
+        }),
+        _track("Video", {
+            "Track_ID": 1,
+            "StreamOrder": 0,
+            "Format": "HEVC",
+            "Format_profile": "Main 10@L5.1@High",
+            "Bit_rate": [21500000, "21.5 Mb/s"],
+            "Bit_rate_mode": "Variable",
+            "Width": 1920,
+            "Height": 1080,
+            "Display_aspect_ratio": ["1.778", "16:9"],
+            "Frame_rate_mode": "Constant",
+            "Frame_rate": ["23.976", "23.976 (24000/1001) FPS"],
+            "FrameRate_Num": 24000,
+            "FrameRate_Den": 1001,
+            "Color_space": "YUV",
+            "Chroma_subsampling": "4:2:0",
+            "Bit_depth": 10,
+            "Scan_type": "Progressive",
+            "HDR_format": "SMPTE ST 2086",
+            "Transfer_characteristics": "PQ",
+            "Language": "en",
+            "Default": "Yes"
+        })
+    ]
+    for i in range(audio_tracks):
+        tracks.append(_track("Audio", {
+            "Track_ID": 2 + i,
+            "StreamOrder": 1 + i,
+            "Format": ["E-AC-3", "AC-3", "DTS"][i % 3],
+            "Bit_rate": [640000, "640 kb/s"],
+            "Bit_rate_mode": "Constant",
+            "Channel_s_": 6,
+            "Channel_layout": "L R C LFE Ls Rs",
+            "Sampling_rate": 48000,
+            "Title": "Commentary" if i == audio_tracks - 1 else "",
+            "Language": LANGUAGES[i % len(LANGUAGES)]
+        }))
+    for i in range(subtitle_tracks):
+        tracks.append(_track("Text", {
+            "Track_ID": 2 + audio_tracks + i,
+            "StreamOrder": 1 + audio_tracks + i,
+            "Format": "UTF-8",
+            "Bit_rate": [80, "80 b/s"],
+            "Title": ["", "SDH", "Forced"][i % 3],
+            "Language": LANGUAGES[i % len(LANGUAGES)]
+        }))
+    tracks.append(_track("Menu", {
+        f"_00_{(i * 8) // 60:02}_{(i * 8) % 60:02}000": f"en:Chapter {i + 1}"
+        for i in range(chapters)
+    }))
+    return f'<?xml version="1.0" encoding="UTF-8"?><Mediainfo><File>{"".join(tracks)}</File></Mediainfo>'
+
+
+def fanart_response() -> str:
+    """Get a synthetic Fanart.tv TV response with banners in a few languages."""
+    return json.dumps({
+        "name": "Benchmark",
+        "thetvdb_id": str(TVDB_ID),
+        "tvbanner": [
+            {"id": str(i), "url": f"https://assets.fanart.tv/fanart/tv/{TVDB_ID}/tvbanner/{lang}-{i}.jpg",
+             "lang": lang, "likes": str(10 - i)}
+            for i, lang in enumerate(("fr", "de", "en", "es"))
+        ]
+    })
+
+
+def imgbox_gallery(images: int = 12) -> str:
+    """Get a synthetic imgbox gallery page with the given amount of images."""
+    thumbs = "\n".join(
+        f'<a href="/Img{i:04}"><img alt="Img{i:04}" src="https://thumbs2.imgbox.com/aa/bb/Img{i:04}_b.png" /></a>'
+        for i in range(images)
+    )
+    return f"<html><body><div id='gallery-view-content'>{thumbs}</div></body></html>"
+
+
+def imdb_title() -> Dict[str, object]:
+    """Get synthetic IMDb title data, in the form of the keys cinemagoer sets on a Movie."""
+    return {
+        "title": "Benchmark",
+        "year": 2006,
+        "kind": "movie",
+        "rating": 8.1,
+        "genres": ["Drama", "Mystery", "Sci-Fi"],
+        "plot outline": "A synthetic title used to benchmark pynfogen. " * 8,
+        "runtimes": ["102"]
+    }
+
+
+def large_template(repeat: int = 40) -> str:
+    """
+    Get a large template exercising every custom format spec, If statements, and nested fields.
+    The template body is repeated to make it representative of large artwork-wrapped templates.
+    """
+    body = (
+        "<?{title:true}?{title:^>70x68}?>\n"
+        "{overview:>>2x68}\n"
+        "<?{note:true}?Note: {note:>>6x62}?:No notes.?>\n"
+        "<?{images:true}?{images:bbimg:layout,2x2x1}?>\n"
+        "Tracks: {tracks:len}, {tracks!s:>>2x68}\n"
+        "<?{missing:true}?never<?{title:true}?nested?>?:{year:05d}?>\n"
+        "{title:{width}}|{year}|{rating:.1f}\n"
+    )
+    return body * repeat
+
+
+def large_template_variables() -> Dict[str, object]:
+    """Get the variables for `large_template`."""
+    images: List[Dict[str, str]] = [
+        {"url": f"https://imgbox.com/Img{i:04}", "src": f"https://thumbs2.imgbox.com/aa/bb/Img{i:04}_t.png"}
+        for i in range(4)
+    ]
+    return {
+        "title": "Benchmark (2006)",
+        "overview": "A synthetic title used to benchmark pynfogen. " * 12,
+        "note": "Encoded from a synthetic source, with synthetic subtitles. " * 3,
+        "images": images,
+        "tracks": [f"- Track {i}" for i in range(16)],
+        "missing": None,
+        "year": 2006,
+        "rating": 8.1,
+        "width": 40
+    }
+
+
+# A template using the NFO variables, similar to the examples, for the NFO.run and generate scenarios
+NFO_TEMPLATE = """\
+{imdb[title]:^>70x68}
+IMDb: https://www.imdb.com/title/{imdb_id}
+<?{tvdb:true}?TVDB: https://thetvdb.com/?tab=series&id={tvdb}?>
+<?{banner_image:true}?{banner_image:bbimg}?>
+Source : {source}
+<?{note:true}?Note   : {note:>>9x60}?>
+
+Video
+{videos_pretty:>>2x68}
+
+Audio
+{audio_pretty:>>2x68}
+
+Subtitles
+{subtitles_pretty:>>2x68}
+
+Chapters : {chapters_yes_no}
+{chapter_entries:>>2x68}
+
+<?{preview_images:true}?{preview_images:bbimg:layout,3x4x1}?>
+"""
+
+DESCRIPTION_TEMPLATE = """\
+[CENTER]{imdb[title]} ({imdb[year]})[/CENTER]
+<?{banner_image:true}?[IMG]{banner_image}[/IMG]?>
+[LIST]
+{videos_pretty:>>0x200}
+{audio_pretty:>>0x200}
+{subtitles_pretty:>>0x200}
+[/LIST]
+"""
+
+ARTWORK = "\n".join(["#" * 74, "##" + " " * 70 + "##", "{nfo}", "##" + " " * 70 + "##", "#" * 74])
@@ -0,0 +1,82 @@
+"""
+Benchmark the import cost of each CLI command using `python -X importtime`.
+
+Each command is run in a fresh interpreter, reporting the total import time along with any of the
+heavy NFO generation dependencies it imported. Commands that do not generate NFOs should import none.
+
+Usage:
+    python benchmarks/import_time.py [--runs 5] [--max-ms 150] [--json]
+"""
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import click
+
+COMMANDS: Tuple[Tuple[str, ...], ...] = (
+    ("about",),
+    ("version",),
+    ("config", "--list"),
+    ("template", "list"),
+    ("artwork", "list"),
+    ("generate", "--help"),
+    ("generate-many", "--help"),
+)
+HEAVY_MODULES = ("imdb", "pymediainfo", "langcodes", "tldextract", "requests", "pyd2v", "jsonpickle")
+RUNNER = "import sys; from pynfogen.cli import cli; cli(sys.argv[1:], prog_name='nfo')"
+
+
+def measure(command: Tuple[str, ...]) -> Tuple[float, Set[str]]:
+    """Run a command in a new interpreter, returning the total import time in ms and the heavy modules imported."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", RUNNER, *command],
+        cwd=Path(__file__).resolve().parent.parent,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+    total = 0
+    heavy = set()
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|", maxsplit=2)
+        total += int(self_us)
+        module = name.strip().split(".")[0]
+        if module in HEAVY_MODULES:
+            heavy.add(module)
+    return total / 1000, heavy
+
+
+@click.command()
+@click.option("-r", "--runs", type=click.IntRange(min=1), default=5, help="Runs per command, the median is used.")
+@click.option("--max-ms", type=float, default=None, help="Fail if any command's import time exceeds this.")
+@click.option("--json", "as_json", is_flag=True, default=False, help="Output results as JSON.")
+def main(runs: int, max_ms: Optional[float], as_json: bool) -> None:
+    """Benchmark the import time of each CLI command."""
+    results: List[Dict] = []
+    for command in COMMANDS:
+        times, heavy = [], set()
+        for _ in range(runs):
+            ms, imported = measure(command)
+            times.append(ms)
+            heavy |= imported
+        results.append({"command": " ".join(command), "ms": statistics.median(times), "heavy": sorted(heavy)})
+
+    if as_json:
+        print(json.dumps(results, indent=2))
+    else:
+        for result in results:
+            print(f"{result['command']:<24} {result['ms']:>8.1f} ms  {', '.join(result['heavy']) or '-'}")
+
+    slow = [x["command"] for x in results if max_ms is not None and x["ms"] > max_ms]
+    if slow:
+        raise click.ClickException(f"Import time exceeded {max_ms} ms for: {', '.join(slow)}")
+
+
+if __name__ == "__main__":
+    main()
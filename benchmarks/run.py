@@ -0,0 +1,236 @@
+"""
+Reproducible, offline benchmarks of NFO construction, template rendering, and generation.
+
+Every scenario runs against synthetic MediaInfo output, a stand-in server for Fanart.tv and imgbox,
+and a seeded IMDb title, within a temporary data directory. The user's configuration, caches,
+templates, and artwork are never read or modified.
+
+Usage:
+    python benchmarks/run.py [-n 20] [-s nfo_run] [-o results.json] [--compare baseline.json]
+
+The MediaInfo scenarios compare the full parse against the fast probe of a real media file, and
+only run if one is provided with --media, e.g., a large MKV.
+"""
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import click
+
+import fixtures
+from stand_in import StandIn
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pynfogen  # noqa: E402
+from pynfogen import config as config_module  # noqa: E402
+from pynfogen import formatter, mediainfo, nfo  # noqa: E402
+from pynfogen.cache import file_key  # noqa: E402
+from pynfogen.cli.generate import generate_files  # noqa: E402
+from pynfogen.formatter import CustomFormats  # noqa: E402
+from pynfogen.nfo import NFO  # noqa: E402
+from pynfogen.tracks.Video import scan_cache  # noqa: E402
+
+
+class Scenario(NamedTuple):
+    """A benchmark, prepare is called (untimed) before each iteration and returns the function to time."""
+    name: str
+    description: str
+    prepare: Callable[["Context"], Callable[[], Any]]
+    media: bool = False  # requires a real media file
+
+
+class Context(NamedTuple):
+    directory: Path
+    file: Path
+    stand_in: StandIn
+    options: Dict[str, Any]  # NFO options shared by the scenarios
+    media: Optional[Path] = None
+
+
+def isolate(directory: Path) -> None:
+    """Point pynfogen's caches, templates, artwork, and configuration at a temporary directory."""
+    for cache in (mediainfo.cache, nfo.imdb_cache, nfo.fanart_cache, formatter.plan_cache, scan_cache):
+        cache.path = directory / "cache.db"
+    config_module.Files.artwork = directory / "artwork" / "{name}.nfo"
+    config_module.Files.template = directory / "templates" / "{name}.nfo"
+    config_module.Files.description = directory / "templates" / "{name}.txt"
+    config_module.config.clear()
+    config_module.config["fanart_api_key"] = "benchmark"
+
+
+def set_up(directory: Path, stand_in: StandIn, media: Optional[Path] = None) -> Context:
+    """Create the synthetic release, templates, and artwork, and seed the MediaInfo and IMDb caches."""
+    from imdb.Movie import Movie
+
+    isolate(directory)
+
+    file = directory / "Benchmark.2006.1080p.BluRay" / "Benchmark.2006.1080p.BluRay.mkv"
+    file.parent.mkdir(parents=True)
+    file.write_bytes(b"\0" * 1024)
+    mediainfo.cache.set(file_key(file), fixtures.media_info_xml())
+    nfo.imdb_cache.set(fixtures.IMDB_ID, Movie(movieID=fixtures.IMDB_ID[2:], data=fixtures.imdb_title()))
+
+    for path, name, text in (
+        (config_module.Files.template, "movie", fixtures.NFO_TEMPLATE),
+        (config_module.Files.description, "movie", fixtures.DESCRIPTION_TEMPLATE),
+        (config_module.Files.artwork, "benchmark", fixtures.ARTWORK)
+    ):
+        path = Path(str(path).format(name=name))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf8")
+
+    return Context(directory, file, stand_in, dict(
+        session=stand_in.session(),
+        tvdb=fixtures.TVDB_ID,
+        preview=fixtures.PREVIEW_URL,
+        source="Benchmark 2006 1080p BluRay",
+        note="Synthetic release."
+    ), media)
+
+
+def reset_compiled_templates() -> None:
+    CustomFormats.plans.clear()
+    CustomFormats.resolved_specs.clear()
+    formatter.plan_cache.clear()
+
+
+def prepare_nfo_init(ctx: Context) -> Callable[[], Any]:
+    return lambda: NFO(ctx.file, fixtures.IMDB_ID, fanart_api_key="benchmark", **ctx.options)
+
+
+def prepare_format_large(cold: bool) -> Callable[[Context], Callable[[], Any]]:
+    template, variables = fixtures.large_template(), fixtures.large_template_variables()
+
+    def prepare(_: Context) -> Callable[[], Any]:
+        if cold:
+            reset_compiled_templates()
+        return lambda: CustomFormats().format(template, **variables)
+    return prepare
+
+
+def prepare_nfo_run(ctx: Context) -> Callable[[], Any]:
+    nfo.fanart_cache.clear()
+    instance = NFO(ctx.file, fixtures.IMDB_ID, fanart_api_key="benchmark", **ctx.options)
+    return lambda: instance.run(fixtures.NFO_TEMPLATE, art=fixtures.ARTWORK)
+
+
+def prepare_generate(ctx: Context) -> Callable[[], Any]:
+    nfo.fanart_cache.clear()
+    return lambda: generate_files(ctx.file, fixtures.IMDB_ID, "movie", artwork="benchmark", **ctx.options)
+
+
+def prepare_media_info(mode: str) -> Callable[[Context], Callable[[], Any]]:
+    def prepare(ctx: Context) -> Callable[[], Any]:
+        assert ctx.media
+        mediainfo.cache.delete(file_key(ctx.media))
+        mediainfo.cache.delete(file_key(ctx.media, "fast"))
+        return lambda: mediainfo.get_media_info(ctx.media, mode)  # type: ignore[arg-type]
+    return prepare
+
+
+SCENARIOS = (
+    Scenario("nfo_init", "NFO construction from cached MediaInfo output", prepare_nfo_init),
+    Scenario("format_large_cold", "CustomFormats.format of a large template, compiling it", prepare_format_large(True)),
+    Scenario("format_large_warm", "CustomFormats.format of a large template, pre-compiled",
+             prepare_format_large(False)),
+    Scenario("nfo_run", "NFO.run with artwork, including the Fanart.tv and imgbox lookups", prepare_nfo_run),
+    Scenario("generate", "generate_files, from NFO construction to writing the NFO and Description",
+             prepare_generate),
+    Scenario("media_info_full", "Uncached MediaInfo parse of the --media file", prepare_media_info("full"),
+             media=True),
+    Scenario("media_info_fast", "Uncached MediaInfo fast probe of the --media file", prepare_media_info("fast"),
+             media=True),
+)
+
+
+def measure(scenario: Scenario, ctx: Context, iterations: int, warmup: int) -> Dict[str, Any]:
+    """Run a scenario, returning timing statistics in milliseconds."""
+    timings: List[float] = []
+    for i in range(warmup + iterations):
+        func = scenario.prepare(ctx)
+        start = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - start) * 1000
+        if i >= warmup:
+            timings.append(elapsed)
+    return {
+        "description": scenario.description,
+        "iterations": iterations,
+        "min_ms": min(timings),
+        "median_ms": statistics.median(timings),
+        "mean_ms": statistics.mean(timings),
+        "stdev_ms": statistics.stdev(timings) if len(timings) > 1 else 0.0
+    }
+
+
+def get_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=Path(__file__).resolve().parent, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any]) -> List[Tuple[str, Optional[float], float, str]]:
+    """Get the baseline and current median of each scenario, with the relative change."""
+    rows = []
+    for name, current in results["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name, {}).get("median_ms")
+        change = f"{(current['median_ms'] - before) / before * 100:+.1f}%" if before else "new"
+        rows.append((name, before, current["median_ms"], change))
+    return rows
+
+
+@click.command()
+@click.option("-n", "--iterations", type=click.IntRange(min=1), default=20, help="Timed iterations per scenario.")
+@click.option("-w", "--warmup", type=click.IntRange(min=0), default=2, help="Untimed iterations per scenario.")
+@click.option("-s", "--scenario", "names", type=click.Choice([x.name for x in SCENARIOS]), multiple=True,
+              help="Only run the given scenarios, may be repeated.")
+@click.option("-o", "--output", type=Path, default=None, help="Save the results as JSON.")
+@click.option("--compare", "baseline_path", type=Path, default=None, help="Results JSON to compare against.")
+@click.option("--media", type=click.Path(exists=True, dir_okay=False, path_type=Path), default=None,
+              help="Real media file for the MediaInfo scenarios, which are skipped without one.")
+def main(iterations: int, warmup: int, names: Tuple[str, ...], output: Optional[Path],
+         baseline_path: Optional[Path], media: Optional[Path]) -> None:
+    """Benchmark NFO construction, template rendering, and generation, offline."""
+    results: Dict[str, Any] = {
+        "version": pynfogen.__version__,
+        "revision": get_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scenarios": {}
+    }
+    with tempfile.TemporaryDirectory(prefix="pynfogen-benchmark-") as directory, StandIn() as stand_in:
+        ctx = set_up(Path(directory), stand_in, media)
+        for scenario in SCENARIOS:
+            if names and scenario.name not in names:
+                continue
+            if scenario.media and not media:
+                continue
+            results["scenarios"][scenario.name] = measure(scenario, ctx, iterations, warmup)
+        results["requests"] = stand_in.hits
+
+    if output:
+        output.write_text(json.dumps(results, indent=2), encoding="utf8")
+    else:
+        print(json.dumps(results, indent=2))
+
+    if baseline_path:
+        baseline = json.loads(baseline_path.read_text(encoding="utf8"))
+        print(f"{'scenario':<20} {'baseline':>12} {'current':>12} {'change':>8}", file=sys.stderr)
+        for name, before, after, change in compare(results, baseline):
+            before_str = f"{before:.2f} ms" if before is not None else "-"
+            print(f"{name:<20} {before_str:>12} {after:>9.2f} ms {change:>8}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Local stand-in for the remote services pynfogen uses, so benchmarks never touch the network.
+
+The stand-in server replays synthetic Fanart.tv and imgbox responses. Requests made through a
+session from `StandIn.session` are sent to it, whatever host they were made to.
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import fixtures
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    routes: Dict[Tuple[str, str], Tuple[str, str]] = {
+        ("webservice.fanart.tv", f"/v3/tv/{fixtures.TVDB_ID}"): ("application/json", fixtures.fanart_response()),
+        ("imgbox.com", urlsplit(fixtures.PREVIEW_URL).path): ("text/html", fixtures.imgbox_gallery()),
+    }
+
+    def do_GET(self) -> None:
+        host = (self.headers.get("Host") or "").split(":")[0]
+        route = self.routes.get((host, urlsplit(self.path).path))
+        self.server.hits[host] = self.server.hits.get(host, 0) + 1  # type: ignore[attr-defined]
+        if not route:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        content_type, body = route
+        data = body.encode("utf8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("ETag", '"benchmark"')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *_: Any) -> None:
+        pass
+
+
+class StandInAdapter(HTTPAdapter):
+    """Transport adapter that sends every request to the stand-in server, keeping the original host as Host."""
+    def __init__(self, address: Tuple[str, int]):
+        super().__init__()
+        self.address = address
+
+    def send(self, request: requests.PreparedRequest, *args: Any, **kwargs: Any) -> requests.Response:
+        url = urlsplit(request.url)
+        request.headers["Host"] = url.hostname or ""
+        request.url = urlunsplit(("http", "%s:%d" % self.address, url.path, url.query, ""))
+        return super().send(request, *args, **kwargs)
+
+
+class StandIn:
+    """Stand-in server running in a background thread, use as a context manager."""
+    def __init__(self) -> None:
+        self.httpd: Optional[ThreadingHTTPServer] = None
+
+    def __enter__(self) -> "StandIn":
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+        self.httpd.hits = {}  # type: ignore[attr-defined]
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+
+    @property
+    def hits(self) -> Dict[str, int]:
+        """Amount of requests received, by host."""
+        return dict(self.httpd.hits) if self.httpd else {}  # type: ignore[attr-defined]
+
+    def session(self) -> requests.Session:
+        """Get a session like `NFO.get_session`, but sending every request to the stand-in server."""
+        from pynfogen.nfo import NFO
+
+        session = NFO.get_session()
+        adapter = StandInAdapter(self.httpd.server_address[:2])  # type: ignore[union-attr]
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
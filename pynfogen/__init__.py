@@ -1 +1,5 @@
 __version__ = "1.1.1"
+
+from pynfogen.rendering import Result, render, render_many  # noqa: E402
+
+__all__ = ("__version__", "Result", "render", "render_many")
@@ -0,0 +1,138 @@
+import gzip
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator, NamedTuple, Optional
+
+import toml
+
+from pynfogen.config import Directories, Files, config
+
+VERSION = 2
+KINDS = {
+    # kind: (Directories attribute, suffix, display name)
+    "art": ("artwork", ".nfo", "Artwork"),
+    "nfo": ("templates", ".nfo", "NFO Template"),
+    "txt": ("templates", ".txt", "Description Template")
+}
+
+
+class Entry(NamedTuple):
+    """A file of an archive, and whether importing it changed the local copy."""
+    kind: str  # config, art, nfo, or txt
+    name: str
+    sha256: str
+    changed: bool = True
+
+    @property
+    def display_name(self) -> str:
+        return "Configuration" if self.kind == "config" else KINDS[self.kind][2]
+
+
+def export_archive(path: Path) -> Iterator[Entry]:
+    """
+    Export the configuration, artwork, and templates to a gzipped JSON Lines archive, yielding each as it's written.
+
+    The first line is a header with the archive version. Each following line is a single file with
+    its SHA-256 hash, so files are read and written one at a time rather than all held in memory.
+    """
+    with gzip.open(path, "wt", encoding="utf8") as f:
+        f.write(json.dumps({"version": VERSION}) + "\n")
+
+        data = toml.dumps(config)
+        entry = Entry("config", Files.config.name, sha256(data.encode("utf8")))
+        f.write(json.dumps({"kind": entry.kind, "name": entry.name, "sha256": entry.sha256, "data": data}) + "\n")
+        yield entry
+
+        for kind, (directory, suffix, _) in KINDS.items():
+            for file in sorted(getattr(Directories, directory).glob(f"*{suffix}")):
+                content = file.read_bytes()
+                entry = Entry(kind, file.stem, sha256(content))
+                f.write(json.dumps({
+                    "kind": kind,
+                    "name": entry.name,
+                    "sha256": entry.sha256,
+                    "data": content.decode("utf8")
+                }) + "\n")
+                yield entry
+
+
+def import_archive(path: Path) -> Iterator[Entry]:
+    """
+    Import the configuration, artwork, and templates of an archive, yielding each as it's read.
+
+    Files are only written if their hash differs from the local copy, and are read from the archive
+    one at a time. Archives from before version 2, a single gzipped JSON document, are also supported
+    but are read into memory in their entirety.
+    """
+    with gzip.open(path, "rt", encoding="utf8") as f:
+        first_line = f.readline()
+        header = json.loads(first_line)
+        if header.get("version", 1) < VERSION:
+            yield from import_legacy(first_line)
+            return
+        if header["version"] > VERSION:
+            raise ValueError(f"The archive is version {header['version']}, which needs a newer version of pynfogen.")
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            content = record["data"].encode("utf8")
+            if sha256(content) != record["sha256"]:
+                raise ValueError(f"The archive's {record['kind']} {record['name']!r} is corrupt, its hash differs.")
+            yield write_entry(record["kind"], record["name"], content)
+
+
+def import_legacy(document: str) -> Iterator[Entry]:
+    """Import a version 1 archive, a single JSON document written by jsonpickle."""
+    import jsonpickle
+
+    data: Dict[str, Any] = jsonpickle.decode(document)
+    yield write_entry("config", Files.config.name, toml.dumps(data["config"]).encode("utf8"))
+    for kind in KINDS:
+        for name, text in data[kind].items():
+            yield write_entry(kind, name, text.encode("utf8"))
+
+
+def write_entry(kind: str, name: str, content: bytes) -> Entry:
+    """Write a file of an archive, unless the local copy already has the same content."""
+    target = get_path(kind, name)
+    digest = sha256(content)
+    if file_sha256(target) == digest:
+        return Entry(kind, name, digest, changed=False)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temp = target.with_name(f".{target.name}.import")
+    temp.write_bytes(content)
+    os.replace(temp, target)  # atomic, so a file is never left partially written
+    if kind == "config":
+        config.clear()
+        config.update(toml.loads(content.decode("utf8")))
+    return Entry(kind, name, digest)
+
+
+def get_path(kind: str, name: str) -> Path:
+    """Get the local path of a file of an archive."""
+    if kind == "config":
+        return Files.config
+    if kind not in KINDS:
+        raise ValueError(f"Unknown archive file kind {kind!r}.")
+    if not name or Path(name).name != name or name.startswith("."):
+        raise ValueError(f"The archive has an invalid file name {name!r}.")
+    directory, suffix, _ = KINDS[kind]
+    return getattr(Directories, directory) / f"{name}{suffix}"
+
+
+def sha256(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def file_sha256(path: Path) -> Optional[str]:
+    """Get the SHA-256 hash of a file, reading it in chunks, or None if it does not exist."""
+    if not path.is_file():
+        return None
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 64), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
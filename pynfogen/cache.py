@@ -0,0 +1,92 @@
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from pynfogen.config import Files
+
+
+class Cache:
+    """
+    Persistent key-value store for results that are expensive to compute, backed by SQLite.
+    Each cache is a table within the same database. Values are pickled, so any picklable object can be stored.
+    """
+    def __init__(self, name: str, path: Path = Files.cache):
+        if not name.isidentifier():
+            raise ValueError(f"Cache name {name!r} must be a valid identifier.")
+        self.name = name
+        self.path = path
+        self._local = threading.local()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Get a connection to the cache database, one per-thread as SQLite connections cannot be shared."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.name} "
+                "(key TEXT PRIMARY KEY, value BLOB NOT NULL, created REAL NOT NULL)"
+            )
+            connection.commit()
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str, default: Any = None, max_age: Optional[float] = None) -> Any:
+        """
+        Get the value stored for key, or default if there is none.
+        If max_age is set, values stored more than max_age seconds ago are treated as missing.
+        """
+        row = self.connection.execute(f"SELECT value, created FROM {self.name} WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return default
+        value, created = row
+        if max_age is not None and time.time() - created > max_age:
+            return default
+        return pickle.loads(value)
+
+    def set(self, key: str, value: Any) -> None:
+        """Store value for key, replacing any existing value."""
+        with self.connection as connection:
+            connection.execute(
+                f"INSERT OR REPLACE INTO {self.name} (key, value, created) VALUES (?, ?, ?)",
+                (key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), time.time())
+            )
+
+    def delete(self, key: str) -> None:
+        """Remove the value stored for key, if any."""
+        with self.connection as connection:
+            connection.execute(f"DELETE FROM {self.name} WHERE key = ?", (key,))
+
+    def prune(self, max_age: Optional[float] = None, max_entries: Optional[int] = None) -> None:
+        """
+        Evict values stored more than max_age seconds ago, then evict the oldest values
+        until no more than max_entries remain.
+        """
+        with self.connection as connection:
+            if max_age is not None:
+                connection.execute(f"DELETE FROM {self.name} WHERE created < ?", (time.time() - max_age,))
+            if max_entries is not None:
+                connection.execute(
+                    f"DELETE FROM {self.name} WHERE key NOT IN "
+                    f"(SELECT key FROM {self.name} ORDER BY created DESC LIMIT ?)",
+                    (max(max_entries, 0),)
+                )
+
+    def clear(self) -> None:
+        """Remove every value stored in this cache."""
+        with self.connection as connection:
+            connection.execute(f"DELETE FROM {self.name}")
+
+
+def file_key(path: Path, *extra: Optional[Any]) -> str:
+    """
+    Get a key identifying the current state of a file by its path, size, and modification time.
+    Any extra values are appended, e.g., to differentiate between options used on the same file.
+    """
+    stat = path.stat()
+    return ":".join(map(str, (path.resolve(), stat.st_size, stat.st_mtime_ns, *extra)))
@@ -1,26 +1,26 @@
 import codecs
-import gzip
 from datetime import datetime
 from pathlib import Path
 
 import click
-import jsonpickle
-import toml
-from click_default_group import DefaultGroup
-from dunamai import Style, Version
-from unidecode import unidecode
 
 from pynfogen import __version__
-from pynfogen.cli.artwork import artwork
-from pynfogen.cli.config import config
-from pynfogen.cli.generate import generate
-from pynfogen.cli.template import template
-from pynfogen.config import Directories, Files
-from pynfogen.config import config as config_data
+from pynfogen.cli.lazy_group import LazyGroup
+from pynfogen.helpers import unidecode_error_handler
 
 
+# sub-commands are imported once used, so commands like `nfo template list` don't pay for importing
+# the NFO generation dependencies, e.g., cinemagoer, pymediainfo, and langcodes
 @click.group(
-    cls=DefaultGroup, default="generate", default_if_no_args=True,
+    cls=LazyGroup, default="generate", default_if_no_args=True,
+    lazy_commands={
+        "artwork": "pynfogen.cli.artwork:artwork",
+        "config": "pynfogen.cli.config:config",
+        "generate": "pynfogen.cli.generate:generate",
+        "generate-many": "pynfogen.cli.generate_many:generate_many",
+        "serve": "pynfogen.cli.serve:serve",
+        "template": "pynfogen.cli.template:template"
+    },
     context_settings=dict(
         help_option_names=["-?", "-h", "--help"],
         max_content_width=116  # max PEP8 line-width, -4 to adjust for initial indent
@@ -33,12 +33,7 @@ def cli() -> None:
     Scriptable MediaInfo-fed NFO Generator for Movies and TV.
     https://github.com/rlaphoenix/pynfogen
     """
-    codecs.register_error("unidecode", lambda e: (
-        unidecode(
-            e.object.decode("utf8") if isinstance(e.object, bytes) else e.object
-        )[e.start:e.end],
-        e.end
-    ))
+    codecs.register_error("unidecode", unidecode_error_handler)
 
 
 @cli.command()
@@ -55,6 +50,8 @@ def about() -> None:
 @cli.command()
 def version() -> None:
     """Shows the version of the project."""
+    from dunamai import Style, Version
+
     try:
         v = Version.from_git().serialize(style=Style.SemVer)
     except RuntimeError:
@@ -66,69 +63,48 @@ def version() -> None:
 @click.argument("out_dir", type=Path)
 def export(out_dir: Path) -> None:
     """Export all configuration, artwork, and templates."""
+    from pynfogen.archive import export_archive
+
     if not out_dir or not out_dir.is_dir():
         raise click.ClickException("Save Path must be directory.")
 
-    art = {x.stem: x.read_text(encoding="utf8") for x in Directories.artwork.glob("*.nfo")}
-    nfo = {x.stem: x.read_text(encoding="utf8") for x in Directories.templates.glob("*.nfo")}
-    txt = {x.stem: x.read_text(encoding="utf8") for x in Directories.templates.glob("*.txt")}
-    json = jsonpickle.dumps({
-        "version": 1,
-        "config": config_data,
-        "art": art,
-        "nfo": nfo,
-        "txt": txt
-    })
+    out_path = out_dir / f"pynfogen.export.{datetime.now().strftime('%Y%m%d-%H%M%S')}.jsonl.gz"
 
-    out_dir.mkdir(parents=True, exist_ok=True)
-    out_path = out_dir / f"pynfogen.export.{datetime.now().strftime('%Y%m%d-%H%M%S')}.json.gz"
-
-    out_path.write_bytes(gzip.compress(json.encode("utf8")))
+    for entry in export_archive(out_path):
+        print(f"Exported {entry.display_name}" + (f": {entry.name}" if entry.kind != "config" else ""))
 
     print(f"Successfully exported to: {out_path}")
 
 
 @cli.command(name="import")
 @click.argument("file", type=Path)
-def import_(file: Path):
+def import_(file: Path) -> None:
     """
     Import all configuration, artwork, and templates from export.
 
     The configuration will be overwritten in it's entirety.
     Current artwork and template files will only be overwritten if
-    they have the same name.
+    they have the same name. Files with the same content are skipped.
     """
+    from pynfogen.archive import import_archive
+
     if not file or not file.exists():
         raise click.ClickException("File path does not exist.")
 
-    decompress = gzip.open(file).read().decode("utf8")
-    json = jsonpickle.decode(decompress)
-
-    Files.config.parent.mkdir(parents=True, exist_ok=True)
-    Directories.artwork.mkdir(parents=True, exist_ok=True)
-    Directories.templates.mkdir(parents=True, exist_ok=True)
-
-    Files.config.write_text(toml.dumps(json["config"]))
-    print("Imported Configuration")
-
-    for name, data in json["art"].items():
-        path = (Directories.artwork / name).with_suffix(".nfo")
-        path.write_text(data, encoding="utf8")
-        print(f"Imported Artwork: {name}")
-
-    for name, data in json["nfo"].items():
-        path = (Directories.templates / name).with_suffix(".nfo")
-        path.write_text(data, encoding="utf8")
-        print(f"Imported NFO Template: {name}")
-
-    for name, data in json["txt"].items():
-        path = (Directories.templates / name).with_suffix(".txt")
-        path.write_text(data, encoding="utf8")
-        print(f"Imported Description Template: {name}")
-
-    print(f"Successfully Imported from {file}!")
-
-
-command: click.Command
-for command in (artwork, config, generate, template):
-    cli.add_command(command)
+    changed = 0
+    try:
+        for entry in import_archive(file):
+            name = f": {entry.name}" if entry.kind != "config" else ""
+            if entry.changed:
+                changed += 1
+                print(f"Imported {entry.display_name}{name}")
+            else:
+                print(f"Unchanged {entry.display_name}{name}")
+    except (OSError, EOFError) as e:  # e.g., not a gzip file, or a truncated one
+        raise click.ClickException(f"The file is not a readable archive, {e}")
+    except ValueError as e:  # e.g., invalid JSON, or a file with a mismatching hash
+        raise click.ClickException(str(e))
+    except (KeyError, TypeError, AttributeError) as e:  # e.g., a record missing its data or hash
+        raise click.ClickException(f"The archive is invalid, a file is missing its {e} or is malformed.")
+
+    print(f"Successfully Imported from {file}! {changed} file(s) changed.")
@@ -1,11 +1,13 @@
+import time
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Any, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import click
-from pymediainfo import MediaInfo
 
 from pynfogen.config import Files, config
-from pynfogen.nfo import NFO
+from pynfogen.rendering import create_nfo, get_release_name, get_template_paths, render, render_nfo, save_files
+from pynfogen.timing import SpanRecorder, span
 
 
 @click.group(context_settings=dict(default_map=config.get("generate", {})))
@@ -18,6 +20,14 @@ from pynfogen.nfo import NFO
 @click.option("-n", "--note", type=str, default=None, help="Notes/special information.")
 @click.option("-p", "--preview", type=str, default=None, help="Preview information, typically an URL.")
 @click.option("-e", "--encoding", type=str, default="utf8", help="Text-encoding for output, input is always UTF-8.")
+@click.option("--refresh", is_flag=True, default=False, help="Ignore cached metadata and fetch it again.")
+@click.option("--offline", is_flag=True, default=False, help="Only use cached metadata, make no network requests.")
+@click.option("--server", type=str, default=None,
+              help="Address of an `nfo serve` daemon to generate with, e.g., 127.0.0.1:8053.")
+@click.option("--profile", type=click.Choice(["table", "json"]), default=None,
+              help="Print the time spent in each phase, as a summary table or JSON lines, to stderr.")
+@click.option("-w", "--watch", is_flag=True, default=False,
+              help="Keep running, and generate again whenever the template or artwork is modified.")
 def generate(**__: Any) -> None:
     """
     Generate an NFO and Description for a release.
@@ -81,73 +91,153 @@ def movie() -> dict:
 @click.pass_context
 def generator(ctx: click.Context, args: dict, file: Path, imdb: str, artwork: Optional[str],
               tmdb: Optional[str], tvdb: Optional[int], source: Optional[str], note: Optional[str],
-              preview: Optional[str], encoding: str, *_: Any, **__: Any) -> None:
+              preview: Optional[str], encoding: str, refresh: bool, offline: bool, server: Optional[str],
+              profile: Optional[str], watch: bool, *_: Any, **__: Any) -> None:
     if not isinstance(ctx, click.Context) or not ctx.invoked_subcommand:
         raise ValueError("Generator called directly, or not used as part of the generate command group.")
-    if not file.is_file():
-        raise click.ClickException("The provided file path is to a folder, not a file.")
-    if not file.exists():
-        raise click.ClickException("The provided file path does not exist.")
-
-    if imdb == "-":
-        imdb = MediaInfo.parse(file).general_tracks[0].to_data().get("imdb")
-        if not imdb:
-            raise ValueError("No IMDB ID was found within the file's metadata.")
-
-    nfo = NFO(
-        file,
-        imdb,
-        **dict(
+
+    if watch and (server or profile):
+        raise click.UsageError("--watch cannot be used with --server or --profile.")
+
+    if server:
+        if profile:
+            raise click.UsageError("--profile cannot be used with --server, the phases run within the daemon.")
+        from pynfogen.server import request_generate
+
+        episode, title = args.get("episode") or (None, None)
+        release_name, saved, error = request_generate(server, {
+            "file": str(file.resolve()),
+            "imdb": imdb,
+            "template": ctx.invoked_subcommand,
+            "artwork": artwork,
+            "encoding": encoding,
+            "tmdb": tmdb,
+            "tvdb": tvdb,
+            "source": source,
+            "note": note,
+            "preview": preview,
+            "refresh": refresh,
+            "offline": offline,
+            "season": args.get("season"),
+            "episode": episode,
+            "title": title
+        })
+        if error:
+            raise click.ClickException(error)
+        for kind, path in saved.items():
+            print(f"Generated {kind} for {release_name}")
+            print(f" + Saved to: {path}")
+        return
+
+    if watch:
+        watch_files(
+            file,
+            imdb,
+            template=ctx.invoked_subcommand,
+            artwork=artwork,
+            encoding=encoding,
             tmdb=tmdb,
             tvdb=tvdb,
             source=source,
             note=note,
             preview=preview,
-            fanart_api_key=config.get("fanart_api_key"),
+            refresh=refresh,
+            offline=offline,
             **args
         )
-    )
-
-    template_vars = {
-        "videos_pretty": nfo.get_video_print(nfo.videos),
-        "audio_pretty": nfo.get_audio_print(nfo.audio),
-        "subtitles_pretty": nfo.get_subtitle_print(nfo.subtitles),
-        "chapters_yes_no": nfo.get_chapter_print_short(nfo.chapters),
-        "chapters_named": nfo.chapters and not nfo.chapters_numbered,
-        "chapter_entries": nfo.get_chapter_print(nfo.chapters)
-    }
+        return
+
+    release_name = get_release_name(file, ctx.invoked_subcommand)
+    recorder = SpanRecorder() if profile else None
+    try:
+        with recorder or nullcontext(), span("generate"):
+            saved = generate_files(
+                file,
+                imdb,
+                template=ctx.invoked_subcommand,
+                artwork=artwork,
+                encoding=encoding,
+                tmdb=tmdb,
+                tvdb=tvdb,
+                source=source,
+                note=note,
+                preview=preview,
+                refresh=refresh,
+                offline=offline,
+                **args
+            )
+    finally:
+        # reported even if generation failed, as the spans may show where it did
+        if recorder:
+            click.echo(recorder.summary() if profile == "table" else recorder.to_json_lines(), err=True)
+
+    for kind, path in saved.items():
+        print(f"Generated {kind} for {release_name}")
+        print(f" + Saved to: {path}")
+
+
+def generate_files(file: Path, imdb: str, template: str, artwork: Optional[str] = None, encoding: str = "utf8",
+                   **config_: Any) -> Dict[str, Path]:
+    """
+    Generate and save the NFO and Description files for a release, see `pynfogen.rendering.render`.
+    Any additional parameters are passed to the NFO constructor.
+
+    Returns the saved file paths keyed by their kind, i.e., "NFO" and "Description".
+    """
+    try:
+        nfo_txt, description_txt = render(file, imdb, template, artwork, **config_)
+    except (FileNotFoundError, IsADirectoryError) as e:
+        raise click.ClickException(str(e))
 
-    template = ctx.invoked_subcommand
+    return save_files(file, template, nfo_txt, description_txt, encoding)
+
+
+def watch_files(file: Path, imdb: str, template: str, artwork: Optional[str] = None, encoding: str = "utf8",
+                interval: float = 0.25, **config_: Any) -> None:
+    """
+    Generate and save the NFO and Description files for a release, then again whenever the template,
+    Description template, or artwork is modified, until interrupted.
+
+    The NFO is only created once, so the MediaInfo parse and the IMDb, Fanart.tv, and preview lookups
+    are re-used by every render. The files are checked for modifications every interval seconds.
+    """
+    try:
+        nfo = create_nfo(file, imdb, **config_)
+    except (FileNotFoundError, IsADirectoryError) as e:
+        raise click.ClickException(str(e))
 
-    artwork_text = None
+    paths = list(get_template_paths(template))
     if artwork:
-        artwork_path = Path(str(Files.artwork).format(name=artwork))
-        if not artwork_path.exists():
-            raise click.ClickException(f"No artwork named {artwork} exists.")
-        artwork_text = artwork_path.read_text(encoding="utf8")
-
-    template_path = Path(str(Files.template).format(name=template))
-    if not template_path.exists():
-        raise click.ClickException(f"No template named {template} exists.")
-    template_text = template_path.read_text(encoding="utf8")
-
-    file_name = {
-        "season": file.parent.name,
-        "episode": file.stem,
-        "movie": file.stem
-    }[ctx.invoked_subcommand]
-
-    nfo_txt = nfo.run(template_text, art=artwork_text, **template_vars)
-    nfo_out = Path(nfo.file).parent / f"{file_name}.nfo"
-    nfo_out.write_text(nfo_txt, encoding=encoding, errors="unidecode")
-    print(f"Generated NFO for {file_name}")
-    print(f" + Saved to: {nfo_out}")
-
-    description_path = Path(str(Files.description).format(name=template))
-    if description_path.exists():
-        description_text = description_path.read_text(encoding="utf8")
-        description_txt = nfo.run(description_text, art=None, **template_vars)
-        description_out = Path(nfo.file).parent / f"{file_name}.desc.txt"
-        description_out.write_text(description_txt, encoding=encoding, errors="unidecode")
-        print(f"Generated Description for {file_name}")
-        print(f" + Saved to: {description_out}")
+        paths.append(Path(str(Files.artwork).format(name=artwork)))
+
+    release_name = get_release_name(file, template)
+    print(f"Watching {', '.join(x.name for x in paths)} for {release_name}, press Ctrl+C to stop")
+
+    last_modified = None
+    try:
+        while True:
+            modified = get_modified_times(paths)
+            if modified != last_modified:
+                last_modified = modified
+                start = time.perf_counter()
+                try:
+                    saved = save_files(file, template, *render_nfo(nfo, template, artwork), encoding=encoding)
+                except Exception as e:  # the template may be invalid while it's being edited, keep watching
+                    print(f"Failed to generate {release_name}: {e!r}")
+                else:
+                    took = (time.perf_counter() - start) * 1000
+                    print(f"Generated {', '.join(saved)} for {release_name} in {took:.0f} ms")
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("Stopped watching")
+
+
+def get_modified_times(paths: List[Path]) -> Tuple[Optional[int], ...]:
+    """Get the modification time of each path, or None if it does not exist."""
+    times: List[Optional[int]] = []
+    for path in paths:
+        try:
+            times.append(path.stat().st_mtime_ns)
+        except FileNotFoundError:
+            times.append(None)
+    return tuple(times)
@@ -0,0 +1,94 @@
+import glob
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import click
+
+from pynfogen.config import config
+from pynfogen.rendering import TEMPLATES, init_worker, run_job
+
+
+@click.command(name="generate-many", context_settings=dict(default_map=config.get("generate", {})))
+@click.argument("files", type=str, nargs=-1)
+@click.option("-m", "--manifest", type=Path, default=None,
+              help="JSON Lines file of jobs, one object per line. Options are used as defaults for each job.")
+@click.option("-t", "--template", type=click.Choice(TEMPLATES), default="movie", help="Template to use.")
+@click.option("-imdb", type=str, default="-", help="IMDb ID (including 'tt'). Defaults to each file's metadata.")
+@click.option("-tmdb", type=str, default=None, help="TMDB ID (including 'tv/' or 'movie/').")
+@click.option("-tvdb", type=int, default=None, help="TVDB ID ('73244' not 'the-office-us').")
+@click.option("--season", type=str, default=None, help="Season Name or Number, for season and episode templates.")
+@click.option("-a", "--artwork", type=str, default=None, help="Artwork to use.")
+@click.option("-s", "--source", type=str, default=None, help="Source information.")
+@click.option("-n", "--note", type=str, default=None, help="Notes/special information.")
+@click.option("-p", "--preview", type=str, default=None, help="Preview information, typically an URL.")
+@click.option("-e", "--encoding", type=str, default="utf8", help="Text-encoding for output, input is always UTF-8.")
+@click.option("--refresh", is_flag=True, default=False, help="Ignore cached metadata and fetch it again.")
+@click.option("--offline", is_flag=True, default=False, help="Only use cached metadata, make no network requests.")
+@click.option("-j", "--jobs", type=click.IntRange(min=1), default=os.cpu_count() or 1,
+              help="Amount of releases to generate in parallel.")
+def generate_many(files: Tuple[str, ...], manifest: Optional[Path], jobs: int, **defaults: Any) -> None:
+    """
+    Generate an NFO and Description for many releases in parallel.
+
+    \b
+    Files may be paths or glob patterns, e.g., "/media/*/*.mkv".
+    Each line of a manifest is a JSON object with a "file" key and optionally any of the
+    options by their long name, e.g., {"file": "a.mkv", "imdb": "tt0487831", "template": "movie"}.
+    Episode releases also need "episode", and optionally "title", within the manifest.
+
+    A failing release does not stop the others, all failures are summarized at the end.
+    """
+    job_list = list(get_jobs(files, manifest, defaults))
+    if not job_list:
+        raise click.ClickException("No files were provided, or none matched the provided patterns.")
+
+    failures: List[Tuple[str, str]] = []
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker) as pool:
+        futures = {pool.submit(run_job, job): job for job in job_list}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                release_name, saved, error = future.result()
+            except BrokenProcessPool:
+                # a worker died, e.g., was killed for running out of memory, failing every unfinished job
+                release_name, saved, error = job["file"], {}, "The worker process terminated abruptly."
+            if error:
+                failures.append((job["file"], error))
+                print(f"Failed to generate for {release_name}: {error}")
+                continue
+            for kind, path in saved.items():
+                print(f"Generated {kind} for {release_name}")
+                print(f" + Saved to: {path}")
+
+    print(f"Generated {len(job_list) - len(failures)} of {len(job_list)} releases.")
+    if failures:
+        for file, error in failures:
+            print(f" - {file}: {error}")
+        raise click.ClickException(f"{len(failures)} of {len(job_list)} releases failed.")
+
+
+def get_jobs(files: Tuple[str, ...], manifest: Optional[Path], defaults: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Yield a job for every file and glob pattern match, followed by every entry of the manifest."""
+    for pattern in files:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        for file in matches:
+            yield dict(defaults, file=file)
+
+    if manifest:
+        if not manifest.is_file():
+            raise click.ClickException(f"The manifest {manifest} does not exist.")
+        with manifest.open(encoding="utf8") as f:
+            for i, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError as e:
+                    raise click.ClickException(f"Manifest line {i} is not valid JSON, {e}")
+                if not isinstance(entry, dict) or not entry.get("file"):
+                    raise click.ClickException(f"Manifest line {i} must be an object with a \"file\" key.")
+                yield dict(defaults, **entry)
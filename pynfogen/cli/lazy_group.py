@@ -0,0 +1,32 @@
+import importlib
+from typing import Any, Dict, List, Optional
+
+import click
+from click_default_group import DefaultGroup
+
+
+class LazyGroup(DefaultGroup):
+    """
+    Command group that only imports a sub-command's module once the sub-command is needed.
+    Lazy sub-commands are provided as a mapping of command name to `module:attribute`.
+    """
+    def __init__(self, *args: Any, lazy_commands: Optional[Dict[str, str]] = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = lazy_commands or {}
+
+    def list_commands(self, ctx: click.Context) -> List[str]:
+        return sorted({*super().list_commands(ctx), *self.lazy_commands})
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> Optional[click.Command]:
+        # unknown names are arguments of the default command, which DefaultGroup will use instead
+        if cmd_name in self.commands or cmd_name in self.lazy_commands:
+            self.load_command(cmd_name)
+        elif self.default_cmd_name:
+            self.load_command(self.default_cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def load_command(self, cmd_name: str) -> None:
+        """Import and add a lazy sub-command, if it's lazy and not yet added."""
+        if cmd_name in self.lazy_commands and cmd_name not in self.commands:
+            module, attribute = self.lazy_commands[cmd_name].split(":")
+            self.add_command(getattr(importlib.import_module(module), attribute), cmd_name)
@@ -0,0 +1,25 @@
+import click
+
+from pynfogen.config import config
+
+
+@click.command(context_settings=dict(default_map=config.get("serve", {})))
+@click.option("--host", type=str, default="127.0.0.1", help="Host to listen on.")
+@click.option("-p", "--port", type=int, default=8053, help="Port to listen on.")
+@click.option("-w", "--workers", type=click.IntRange(min=1), default=4, help="Amount of requests to handle at once.")
+def serve(host: str, port: int, workers: int) -> None:
+    """
+    Run a local daemon that generates NFOs over HTTP, with warm caches.
+
+    \b
+    Generate with it using `nfo generate --server 127.0.0.1:8053 ...`, or by POSTing a
+    JSON object in the same format as a `nfo generate-many` manifest line to /generate.
+    It is not authenticated, so only listen on addresses you trust.
+    """
+    from pynfogen.server import serve as serve_
+
+    print(f"Serving on http://{host}:{port}, press CTRL+C to stop.")
+    try:
+        serve_(host, port, workers)
+    except KeyboardInterrupt:
+        pass
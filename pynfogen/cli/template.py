@@ -1,9 +1,10 @@
 import logging
 from pathlib import Path
+from typing import Optional
 
 import click
 
-from pynfogen.config import Directories, Files
+from pynfogen.config import Directories, Files, config
 from pynfogen.helpers import open_file
 
 
@@ -60,3 +61,73 @@ def list_() -> None:
 def explore() -> None:
     """Open the template directory in your File Explorer."""
     open_file(str(Directories.templates))
+
+
+@template.command()
+@click.argument("name", type=str)
+@click.option("-d", "--description", is_flag=True, default=False, help="Specify template as a Description template.")
+@click.option("-a", "--artwork", type=str, default=None, help="Artwork to wrap the template in.")
+@click.option("-f", "--file", type=Path, default=None,
+              help="Release file to render against, only using cached metadata. A synthetic release by default.")
+@click.option("-i", "--imdb", type=str, default="-", help="IMDb ID of the release file, if not in its metadata.")
+@click.option("-n", "--iterations", type=click.IntRange(min=1), default=50, help="Amount of times to render it.")
+@click.option("-t", "--top", type=click.IntRange(min=1), default=15, help="Amount of fields and specs to list.")
+def profile(name: str, description: bool, artwork: Optional[str], file: Optional[Path], imdb: str,
+            iterations: int, top: int) -> None:
+    """
+    Profile the rendering of a template, listing the slowest fields and format specs.
+
+    \b
+    Times are per render and fields include the time of their format specs.
+    Any If statement conditions are listed as fields.
+    """
+    from pynfogen.rendering import read_text
+    from pynfogen.template_profile import get_synthetic_variables, profile_template
+
+    location = Path(str(Files.description if description else Files.template).format(name=name))
+    if not location.exists():
+        raise click.ClickException(f"Template {name} does not exist.")
+    template_text = read_text(location)
+
+    art = None
+    if artwork:
+        artwork_path = Path(str(Files.artwork).format(name=artwork))
+        if not artwork_path.exists():
+            raise click.ClickException(f"No artwork named {artwork} exists.")
+        art = read_text(artwork_path)
+
+    if file:
+        from pynfogen.mediainfo import get_media_info
+        from pynfogen.nfo import NFO
+
+        if not file.is_file():
+            raise click.ClickException("The provided file path does not exist, or is a folder.")
+        if imdb == "-":
+            file_imdb = get_media_info(file).general_tracks[0].to_data().get("imdb")
+            if not file_imdb:
+                raise click.ClickException("No IMDB ID was found within the file's metadata, provide one.")
+            imdb = file_imdb
+        try:
+            nfo = NFO(file, imdb, fanart_api_key=config.get("fanart_api_key"), offline=True)
+            variables = nfo.get_variables(template_text + (art or ""))
+        except ValueError as e:  # e.g., the IMDb title is not cached
+            raise click.ClickException(str(e))
+    else:
+        variables = get_synthetic_variables()
+
+    try:
+        result = profile_template(template_text, variables, art, iterations)
+    except KeyError as e:
+        raise click.ClickException(f"The template uses an unknown variable {e}.")
+    except (AttributeError, IndexError, TypeError) as e:
+        raise click.ClickException(f"The template uses a field that cannot be resolved, {e}.")
+
+    print(f"Rendered {name} {iterations} times, {result.seconds * 1000 / iterations:.3f} ms per render")
+    for title, stats in (("Field", result.formats.fields), ("Format spec", result.formats.specs)):
+        rows = result.rows(stats)
+        width = max([len(title)] + [len(x[0]) for x in rows[:top]])
+        print(f"\n{title:<{width}} {'calls':>5} {'time':>12} {'share':>6}")
+        for label, calls, ms, share in rows[:top]:
+            print(f"{label:<{width}} {calls:>5} {ms:>9.3f} ms {share:>6.1%}")
+        if len(rows) > top:
+            print(f"... and {len(rows) - top} more")
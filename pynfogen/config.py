@@ -8,6 +8,7 @@ class Directories:
     user = Path(user_data_dir("pynfogen", "PHOENiX"))
     artwork = user / "artwork"
     templates = user / "templates"
+    cache = user / "cache"
 
 
 class Files:
@@ -15,6 +16,7 @@ class Files:
     artwork = Directories.artwork / "{name}.nfo"
     template = Directories.templates / "{name}.nfo"
     description = Directories.templates / "{name}.txt"
+    cache = Directories.cache / "cache.db"
 
 
 if Files.config.exists():
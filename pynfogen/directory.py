@@ -0,0 +1,80 @@
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Tuple
+
+
+class DirectoryListing(NamedTuple):
+    """The files of a directory at the time it was last modified."""
+    mtime_ns: int
+    files: Tuple[Tuple[str, int], ...]  # (name, size) of each file, sorted by name
+
+
+class SeasonInfo(NamedTuple):
+    """Facts about a season release, from the files neighbouring one of its episodes."""
+    files: List[str]  # names of each episode file, sorted
+    size: int  # total size of the episode files in bytes
+    episodes: List[int]  # episode numbers found in the file names, sorted
+    gaps: List[int]  # episode numbers missing between the first and last episode number found
+
+
+class DirectoryIndex:
+    """
+    Index of directory listings, shared by every NFO of a process.
+    Each directory is listed with a single `os.scandir` and only listed again once its modification
+    time changes, i.e., once files are added, removed, or renamed.
+    """
+    EPISODE_NUMBER = re.compile(r"(?:S\d{1,4}[ ._-]?|\b)EP?(\d{1,4})(?!\d)", re.IGNORECASE)
+
+    def __init__(self) -> None:
+        self.listings: Dict[Path, DirectoryListing] = {}
+        self._lock = threading.Lock()
+
+    def get_listing(self, directory: Path) -> DirectoryListing:
+        """Get the files of a directory, listing it again only if it has changed."""
+        directory = directory.resolve()
+        mtime_ns = directory.stat().st_mtime_ns
+        with self._lock:
+            listing = self.listings.get(directory)
+        if listing is None or listing.mtime_ns != mtime_ns:
+            with os.scandir(directory) as entries:
+                files = tuple(sorted(
+                    (entry.name, entry.stat().st_size)
+                    for entry in entries
+                    if entry.is_file()
+                ))
+            listing = DirectoryListing(mtime_ns, files)
+            with self._lock:
+                self.listings[directory] = listing
+        return listing
+
+    def get_season_info(self, file: Path) -> SeasonInfo:
+        """Get facts about the season release of an episode file, from its same-extension neighbouring files."""
+        files = [
+            (name, size)
+            for name, size in self.get_listing(file.parent).files
+            if name.endswith(file.suffix)
+        ]
+
+        episodes = set()
+        for name, _ in files:
+            match = self.EPISODE_NUMBER.search(Path(name).stem)
+            if match:
+                episodes.add(int(match.group(1)))
+        gaps = sorted(set(range(min(episodes), max(episodes) + 1)) - episodes) if episodes else []
+
+        return SeasonInfo(
+            files=[name for name, _ in files],
+            size=sum(size for _, size in files),
+            episodes=sorted(episodes),
+            gaps=gaps
+        )
+
+    def clear(self) -> None:
+        """Forget every directory listing."""
+        with self._lock:
+            self.listings.clear()
+
+
+directory_index = DirectoryIndex()
@@ -1,27 +1,208 @@
+import hashlib
+import logging
 import re
 import textwrap
+import time
 from string import Formatter
-from typing import Any, List, Union
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Pattern, Sequence, Tuple, TypeVar, Union
 
+from pynfogen.cache import Cache
+from pynfogen.helpers import LRUCache
 
-class CustomFormats(Formatter):
+plan_cache = Cache("templates")
+
+SpecFunc = TypeVar("SpecFunc", bound=Callable[..., Any])
+
+
+class SpecHandler(NamedTuple):
+    """A registered custom format spec."""
+    func: Callable[..., Any]
+    pattern: Pattern[str]
+    group_casts: Optional[Tuple[Callable[[str], Any], ...]] = None
+    return_cast: Optional[Callable[[Any], Any]] = None
+
+
+class Spec(NamedTuple):
+    """A format spec resolved to the name of its handler and the arguments parsed from it."""
+    text: str
+    handler: Optional[str] = None  # None for standard format specs
+    args: Dict[str, Any] = {}
+
+
+class Field(NamedTuple):
+    """A replacement field of a compiled template."""
+    name: Union[int, str]
+    path: Tuple[Tuple[bool, Union[int, str]], ...]  # (is attribute, key) lookups to apply after the name
+    conversion: Optional[str]
+    specs: Tuple[Spec, ...]
+    spec_plan: Optional[Tuple[Any, ...]] = None  # set instead of specs if the format spec has replacement fields
+
+    @property
+    def label(self) -> str:
+        """The field as it would be written in a template, e.g., `{imdb[title]:>>2x68}`."""
+        text = str(self.name) + "".join(f".{key}" if is_attr else f"[{key}]" for is_attr, key in self.path)
+        if self.conversion:
+            text += f"!{self.conversion}"
+        if self.spec_plan is not None:
+            text += ":{...}"
+        elif any(spec.text for spec in self.specs):
+            text += ":" + ":".join(spec.text for spec in self.specs)
+        return "{" + text + "}"
+
+
+class Conditional(NamedTuple):
+    """A `<?condition?then?:otherwise?>` block of a compiled template."""
+    condition: Union[str, Field]
+    then: Tuple[Any, ...]
+    otherwise: Tuple[Any, ...] = ()
+
+
+class OpenConditional(NamedTuple):
+    """A conditional block that is still being parsed, see `CustomFormats.parse_conditionals`."""
+    condition: Union[str, Field]
+    then: List[Any]
+    otherwise: List[Any]
+
+
+Plan = Tuple[Union[str, Field, Conditional], ...]
+
+
+class FormatProfile:
+    """
+    Calls and total time of each field and format spec rendered by a CustomFormats while profiling.
+    Field times are inclusive of their format specs, and of any fields within their format spec.
+    """
     def __init__(self) -> None:
+        self.fields: Dict[str, List[float]] = {}  # [calls, seconds] by field label
+        self.specs: Dict[str, List[float]] = {}  # [calls, seconds] by spec handler name, or format(spec) if standard
+
+    def add(self, stats: Dict[str, List[float]], key: str, seconds: float) -> None:
+        entry = stats.get(key)
+        if entry is None:
+            entry = stats[key] = [0, 0.0]
+        entry[0] += 1
+        entry[1] += seconds
+
+
+def split_field_name(field_name: str) -> Tuple[Union[int, str], List[Tuple[bool, Union[int, str]]]]:
+    """
+    Split a replacement field's name into the first name and the (is attribute, key) lookups after it,
+    e.g., `imdb[title].upper` is ("imdb", [(False, "title"), (True, "upper")]), the same as `str.format`.
+    Names and item keys that are only digits are ints, and an empty first name is left for auto-numbering.
+    """
+    end = len(field_name)
+    for i, c in enumerate(field_name):
+        if c in ".[":
+            end = i
+            break
+    first = field_name[:end]
+    name: Union[int, str] = int(first) if first.isdigit() else first
+
+    path: List[Tuple[bool, Union[int, str]]] = []
+    i = end
+    while i < len(field_name):
+        if field_name[i] == ".":
+            i += 1
+            stop = len(field_name)
+            for j in range(i, len(field_name)):
+                if field_name[j] in ".[":
+                    stop = j
+                    break
+            if stop == i:
+                raise ValueError("Empty attribute in format string")
+            path.append((True, field_name[i:stop]))
+            i = stop
+        elif field_name[i] == "[":
+            stop = field_name.find("]", i + 1)
+            if stop == -1:
+                raise ValueError("Missing ']' in format string")
+            if stop == i + 1:
+                raise ValueError("Empty attribute in format string")
+            key = field_name[i + 1:stop]
+            path.append((False, int(key) if key.isdigit() else key))
+            i = stop + 1
+            if i < len(field_name) and field_name[i] not in ".[":
+                raise ValueError("Only '.' or '[' may follow ']' in format field specifier")
+    return name, path
+
+
+class CustomFormats(Formatter):
+    PLAN_VERSION = 3  # increment when the structure of a Plan changes to invalidate cached plans
+    ENTRY_POINT_GROUP = "pynfogen.format_specs"
+    CONDITIONAL_MARKER = re.compile(r"<\?|\?>|\?:")
+    LITERAL_CONDITION = re.compile(r"([01])\?")
+
+    MAX_PLANS = 256  # amount of compiled templates kept in memory, the least recently used are dropped first
+    MAX_RESOLVED_SPECS = 1024  # amount of resolved format specs kept in memory, the same way
+    PLAN_CACHE_MAX_ENTRIES = 1000  # amount of compiled templates kept on disk, the oldest are dropped first
+
+    plans: LRUCache[str, Plan] = LRUCache(MAX_PLANS)
+    specs: Dict[str, SpecHandler] = {}  # custom format specs by name, matched in order of registration
+    resolved_specs: LRUCache[str, Spec] = LRUCache(MAX_RESOLVED_SPECS)  # memoized results of resolve_spec
+    plugins_loaded = False
+
+    def __init__(self, profile: Optional[FormatProfile] = None):
         super().__init__()
-        self.custom_specs = [
-            # function, regex matcher, group casts (optional), return cast (optional)
-            (self.boolean, r"^(?P<spec>!?(?:true|false))$", None, str),
-            (self.length, "^len$", None, str),
-            (self.bbimg, "^bbimg$", None, None),
-            (self.layout, r"^layout,(?P<width>\d+)x(?P<height>\d+)x(?P<spacing>\d+)$", (int, int, int), None),
-            (self.wrap, r"^>>(?P<indent>\d+)x(?P<width>\d+)$", (int, int), None),
-            (self.center, r"^\^>(?P<center_width>\d+)x(?P<wrap_width>\d+)$", (int, int), None)
-        ]
+        self.profile = profile  # if set, every field and format spec rendered is timed into it
 
-    def chain(self, value: Any, format_spec: str) -> Any:
-        """Support chaining format specs separated by `:`."""
-        for spec in format_spec.split(":"):
-            value = self.format_field(value, spec)
-        return value
+    @classmethod
+    def register(cls, name: str, pattern: str, group_casts: Optional[Tuple[Callable[[str], Any], ...]] = None,
+                 return_cast: Optional[Callable[[Any], Any]] = None) -> Callable[[SpecFunc], SpecFunc]:
+        """
+        Register a function as a custom format spec. Registering an existing name replaces it.
+
+        The function is called with the value, and the named groups of the pattern as keyword
+        arguments. Each group is cast by the group cast at the same index, if provided. The
+        function's result is cast by the return cast, if provided.
+
+        Example:
+            >>> @CustomFormats.register("upper", r"^upper$")
+            ... def upper(value: str) -> str:
+            ...     return value.upper()
+        """
+        def decorator(func: SpecFunc) -> SpecFunc:
+            cls.specs[name] = SpecHandler(func, re.compile(pattern), group_casts, return_cast)
+            cls.resolved_specs.clear()
+            cls.plans.clear()
+            return func
+        return decorator
+
+    @classmethod
+    def load_plugins(cls) -> None:
+        """
+        Register custom format specs from installed packages, once.
+
+        Packages provide them with an entry point in the `pynfogen.format_specs` group,
+        pointing to a function that is called with this class to register its specs.
+        """
+        if cls.plugins_loaded:
+            return
+        cls.plugins_loaded = True
+        log = logging.getLogger("formatter")
+        try:
+            from importlib.metadata import entry_points
+        except ImportError:  # Python 3.7
+            try:
+                from importlib_metadata import entry_points  # type: ignore[no-redef]
+            except ImportError:
+                log.warning(
+                    "Format spec plugins are not loaded, on Python 3.7 they need the importlib_metadata package."
+                )
+                return
+        eps = entry_points()
+        group: Iterable[Any]
+        if isinstance(eps, dict) and not hasattr(eps, "select"):  # Python 3.8 and 3.9, entry points by group
+            group = eps.get(cls.ENTRY_POINT_GROUP, [])
+        else:
+            group = eps.select(group=cls.ENTRY_POINT_GROUP)
+        for ep in group:
+            try:
+                plugin = ep.load()
+                if not callable(plugin):
+                    raise TypeError(f"it points to a {type(plugin).__name__}, not a function")
+                plugin(cls)
+            except Exception as e:  # a broken plugin should not stop every template from rendering
+                log.warning(f"Skipped the format spec plugin {ep.name!r} as it failed to load, {e!r}")
 
     @staticmethod
     def boolean(value: Any, spec: str) -> int:
@@ -99,10 +280,11 @@ class CustomFormats(Formatter):
         grid_str = ("\n" * (spacing + 1)).join(grid_indented)
         return grid_str
 
-    def wrap(self, value: Union[List[str], str], indent: int, width: int) -> str:
+    @staticmethod
+    def wrap(value: Union[List[str], str], indent: int, width: int) -> str:
         """Text-wrap data at a specific width and indent amount."""
         if isinstance(value, list):
-            return self.list_to_indented_strings(value, indent)
+            return CustomFormats.list_to_indented_strings(value, indent)
         return "\n".join(textwrap.wrap(value or "", width, subsequent_indent=" " * indent))
 
     @staticmethod
@@ -110,25 +292,227 @@ class CustomFormats(Formatter):
         """Center data at a specific width, while also text-wrapping at a specific width."""
         return "\n".join([x.center(center_width) for x in textwrap.wrap(value or "", wrap_width)])
 
+    def vformat(self, format_string: str, args: Sequence[Any], kwargs: Any) -> str:  # type: ignore[override]
+        """Format a string using a compiled plan of the string, see `compile`."""
+        return self.render(self.compile(format_string), args, kwargs)
+
+    def compile(self, format_string: str) -> Plan:
+        """
+        Compile a template into a reusable render plan of literal text and replacement fields
+        with pre-resolved format specs. Plans are cached in memory and on disk by the content hash
+        of the template, so repeat renders skip parsing and format spec resolution entirely.
+        Up to `MAX_PLANS` plans are kept in memory, and `PLAN_CACHE_MAX_ENTRIES` on disk.
+        """
+        plan = self.plans.get(format_string)
+        if plan is None:
+            self.load_plugins()
+            # plans refer to specs by name, so they are only valid for the same registered specs
+            specs = repr([(k, v.pattern.pattern) for k, v in self.specs.items()])
+            key = ":".join((
+                self.__class__.__qualname__,
+                str(self.PLAN_VERSION),
+                hashlib.sha256(specs.encode("utf8")).hexdigest(),
+                hashlib.sha256(format_string.encode("utf8")).hexdigest()
+            ))
+            plan = plan_cache.get(key)
+            if plan is None:
+                plan = self.parse_plan(format_string)
+                plan_cache.set(key, plan)
+                plan_cache.prune(max_entries=self.PLAN_CACHE_MAX_ENTRIES)
+            self.plans.set(format_string, plan)
+        return plan
+
+    def parse_plan(self, format_string: str) -> Plan:
+        """Parse a template into a render plan, see `compile`."""
+        tokens: List[Union[str, Field]] = []
+        auto_index = 0
+        for literal_text, field_name, format_spec, conversion in self.parse(format_string):
+            if literal_text:
+                tokens.append(literal_text)
+            if field_name is None:
+                continue
+            name, path = split_field_name(field_name)
+            if name == "":
+                name = auto_index
+                auto_index += 1
+            if format_spec and "{" in format_spec:
+                field = Field(name, tuple(path), conversion, (), self.parse_plan(format_spec))
+            else:
+                field = Field(name, tuple(path), conversion, self.compile_specs(format_spec or ""))
+            tokens.append(field)
+        return self.parse_conditionals(tokens)
+
+    @classmethod
+    def parse_conditionals(cls, tokens: List[Union[str, Field]]) -> Plan:
+        """
+        Build a plan from literal text and fields in a single pass, parsing any conditional blocks.
+
+        A conditional block is `<?{condition}?then?>` or `<?{condition}?then?:otherwise?>`, where
+        the condition is a single field, typically using the boolean format spec, or a literal 0 or 1.
+        The then branch is used unless the condition renders to an empty string or 0. Blocks may be
+        nested. Text that looks like the start of a block but has no condition is left as-is.
+        """
+        root: List[Any] = []
+        frames: List[OpenConditional] = []
+        in_else: List[bool] = []
+
+        def append(node: Any) -> None:
+            nodes = root if not frames else frames[-1].otherwise if in_else[-1] else frames[-1].then
+            if isinstance(node, str) and nodes and isinstance(nodes[-1], str):
+                nodes[-1] += node
+            else:
+                nodes.append(node)
+
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            i += 1
+            if not isinstance(token, str):
+                append(token)
+                continue
+            text, pos = token, 0
+            while True:
+                m = cls.CONDITIONAL_MARKER.search(text, pos)
+                if not m:
+                    break
+                if m.start() > pos:
+                    append(text[pos:m.start()])
+                pos = m.end()
+                marker = m.group()
+                if marker == "<?":
+                    literal = cls.LITERAL_CONDITION.match(text, pos)
+                    if literal:
+                        frames.append(OpenConditional(literal.group(1), [], []))
+                        in_else.append(False)
+                        pos = literal.end()
+                        continue
+                    if pos == len(text) and i + 1 < len(tokens):
+                        condition, following = tokens[i], tokens[i + 1]
+                        if isinstance(condition, Field) and isinstance(following, str) and following.startswith("?"):
+                            frames.append(OpenConditional(condition, [], []))
+                            in_else.append(False)
+                            text, pos = following, 1
+                            i += 2
+                            continue
+                elif marker == "?>" and frames:
+                    frame = frames.pop()
+                    in_else.pop()
+                    append(Conditional(frame.condition, tuple(frame.then), tuple(frame.otherwise)))
+                    continue
+                elif marker == "?:" and frames and not in_else[-1]:
+                    in_else[-1] = True
+                    continue
+                append(marker)
+            if pos < len(text):
+                append(text[pos:])
+
+        if frames:
+            raise ValueError(f"{len(frames)} conditional block(s) opened with `<?` were never closed with `?>`.")
+
+        return tuple(root)
+
+    def compile_specs(self, format_spec: str) -> Tuple[Spec, ...]:
+        """Resolve each of the chained format specs, separated by `:`, to their handler."""
+        return tuple(self.resolve_spec(spec) for spec in format_spec.split(":"))
+
+    def resolve_spec(self, format_spec: str) -> Spec:
+        """Resolve a single format spec to its custom handler, or a standard format spec if none match."""
+        spec = self.resolved_specs.get(format_spec)
+        if spec is None:
+            self.load_plugins()
+            spec = Spec(format_spec)
+            for name, handler in self.specs.items():
+                match = handler.pattern.match(format_spec)
+                if not match:
+                    continue
+                groups = match.groupdict()  # type: dict[str, Any]
+                if handler.group_casts:
+                    groups = {k: handler.group_casts[i](v) for i, (k, v) in enumerate(groups.items())}
+                spec = Spec(format_spec, name, groups)
+                break
+            self.resolved_specs.set(format_spec, spec)
+        return spec
+
+    def apply_spec(self, value: Any, spec: Spec) -> Any:
+        """Apply a resolved format spec to value."""
+        if self.profile is not None:
+            start = time.perf_counter()
+            try:
+                return self._apply_spec(value, spec)
+            finally:
+                self.profile.add(
+                    self.profile.specs, spec.handler or f"format({spec.text})", time.perf_counter() - start
+                )
+        return self._apply_spec(value, spec)
+
+    def _apply_spec(self, value: Any, spec: Spec) -> Any:
+        if spec.handler is None:
+            return super().format_field(value, spec.text)
+        handler = self.specs[spec.handler]
+        new_value = handler.func(value, **spec.args)
+        if handler.return_cast:
+            new_value = handler.return_cast(new_value)
+        return new_value
+
+    def render(self, plan: Plan, args: Sequence[Any], kwargs: Any) -> str:
+        """Render a compiled plan with the provided positional and keyword variables."""
+        result = []
+        for node in plan:
+            if isinstance(node, str):
+                result.append(node)
+            elif isinstance(node, Conditional):
+                condition = node.condition
+                if isinstance(condition, Field):
+                    condition = self.render_field(condition, args, kwargs)
+                branch = node.then if condition.strip() not in ("", "0") else node.otherwise
+                result.append(self.render(branch, args, kwargs))
+            else:
+                result.append(self.render_field(node, args, kwargs))
+        return "".join(result)
+
+    def render_field(self, field: Field, args: Sequence[Any], kwargs: Any) -> str:
+        """Render a single replacement field of a compiled plan."""
+        if self.profile is not None:
+            start = time.perf_counter()
+            try:
+                return self._render_field(field, args, kwargs)
+            finally:
+                self.profile.add(self.profile.fields, field.label, time.perf_counter() - start)
+        return self._render_field(field, args, kwargs)
+
+    def _render_field(self, field: Field, args: Sequence[Any], kwargs: Any) -> str:
+        obj = args[field.name] if isinstance(field.name, int) else kwargs[field.name]
+        for is_attr, key in field.path:
+            obj = getattr(obj, key) if is_attr else obj[key]  # type: ignore[arg-type]
+        if field.conversion:
+            obj = self.convert_field(obj, field.conversion)
+        if field.spec_plan is not None:
+            obj = self.format_field(obj, self.render(field.spec_plan, args, kwargs))
+        else:
+            for spec in field.specs:
+                obj = self.apply_spec(obj, spec)
+        return obj if isinstance(obj, str) else format(obj)
+
     def format_field(self, value: Any, format_spec: str) -> str:
         """Apply both standard formatters along with custom formatters to value."""
-        if ":" in format_spec:
-            return self.chain(value, format_spec)
-        for func, match_str, group_casts, return_cast in self.custom_specs:
-            match = re.match(match_str, format_spec)
-            if not match:
-                continue
-            groups = match.groupdict()  # type: dict[str, Any]
-            if group_casts:
-                groups = {k: group_casts[i](v) for i, (k, v) in enumerate(groups.items())}
-            new_value = func(value, **groups)
-            if return_cast:
-                new_value = return_cast(new_value)
-            return new_value
-        return super().format_field(value, format_spec)
-
-    def list_to_indented_strings(self, value: list, indent: int = 0) -> str:
+        for spec in self.compile_specs(format_spec):
+            value = self.apply_spec(value, spec)
+        return value
+
+    @staticmethod
+    def list_to_indented_strings(value: list, indent: int = 0) -> str:
         """Recursively convert a list to an indented \n separated string."""
         if isinstance(value[0], list):
-            return self.list_to_indented_strings(value[0], indent)
+            return CustomFormats.list_to_indented_strings(value[0], indent)
         return f"\n{' ' * indent}".join(value)
+
+
+for _name, _pattern, _group_casts, _return_cast in (
+    ("boolean", r"^(?P<spec>!?(?:true|false))$", None, str),
+    ("length", "^len$", None, str),
+    ("bbimg", "^bbimg$", None, None),
+    ("layout", r"^layout,(?P<width>\d+)x(?P<height>\d+)x(?P<spacing>\d+)$", (int, int, int), None),
+    ("wrap", r"^>>(?P<indent>\d+)x(?P<width>\d+)$", (int, int), None),
+    ("center", r"^\^>(?P<center_width>\d+)x(?P<wrap_width>\d+)$", (int, int), None)
+):
+    CustomFormats.register(_name, _pattern, _group_casts, _return_cast)(getattr(CustomFormats, _name))
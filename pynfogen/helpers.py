@@ -1,6 +1,14 @@
 import os
 import platform
 import subprocess
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Hashable, Optional, Tuple, TypeVar
+
+from unidecode import unidecode
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
 
 
 def open_file(path: str) -> None:
@@ -12,3 +20,63 @@ def open_file(path: str) -> None:
     else:
         # TODO: What about systems that do not use a WM/GUI?
         subprocess.run(("xdg-open", path), check=True)
+
+
+def unidecode_error_handler(e: UnicodeError) -> Tuple[str, int]:
+    """Codec error handler that replaces un-encodable characters with their closest ASCII equivalent."""
+    return (
+        unidecode(
+            e.object.decode("utf8") if isinstance(e.object, bytes) else e.object  # type: ignore
+        )[e.start:e.end],  # type: ignore
+        e.end  # type: ignore
+    )
+
+
+class cached_property:
+    """
+    Property that is computed on first access and then stored as an instance attribute.
+    Equivalent to functools.cached_property, which is not available on Python 3.7.
+    """
+    def __init__(self, func: Callable[[Any], Any]):
+        self.func = func
+        self.__doc__ = func.__doc__
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance: Any, owner: Optional[type] = None) -> Any:
+        if instance is None:
+            return self
+        value = instance.__dict__[self.name] = self.func(instance)
+        return value
+
+
+class LRUCache(Generic[K, V]):
+    """Thread-safe in-memory cache of up to maxsize values, dropping the least recently used first."""
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._values: "OrderedDict[K, V]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def get(self, key: K) -> Optional[V]:
+        """Get the value stored for key, or None if there is none, marking it as the most recently used."""
+        with self._lock:
+            value = self._values.get(key)
+            if value is not None:
+                self._values.move_to_end(key)
+            return value
+
+    def set(self, key: K, value: V) -> None:
+        """Store a value for key, dropping the least recently used values if there are more than maxsize."""
+        with self._lock:
+            self._values[key] = value
+            self._values.move_to_end(key)
+            while len(self._values) > self.maxsize:
+                self._values.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
@@ -0,0 +1,35 @@
+from functools import lru_cache
+from typing import Iterable, Optional, Tuple
+
+import langcodes
+from langcodes import Language
+
+# language codes commonly found in releases, to resolve ahead of time with `prewarm`
+COMMON_LANGUAGES = (
+    "en", "es", "fr", "de", "it", "pt", "nl", "sv", "no", "da", "fi", "pl", "cs", "hu", "ro", "el", "tr", "ru",
+    "uk", "ar", "he", "hi", "th", "vi", "id", "ms", "ja", "ko", "zh"
+)
+
+
+@lru_cache(maxsize=None)
+def get_display_name(code: str, language: str = "en") -> str:
+    """
+    Get the display name of a language code, e.g., 'Spanish' for 'es'.
+    Results are memoized for the lifetime of the process.
+    """
+    return Language.get(code).display_name(language)
+
+
+@lru_cache(maxsize=None)
+def closest_supported_match(desired: str, supported: Tuple[str, ...], max_distance: int = 25) -> Optional[str]:
+    """
+    Get the language of supported that is the closest match to desired, see `langcodes.closest_supported_match`.
+    Results are memoized for the lifetime of the process.
+    """
+    return langcodes.closest_supported_match(desired, list(supported), max_distance)
+
+
+def prewarm(codes: Iterable[str] = COMMON_LANGUAGES) -> None:
+    """Resolve the display names of language codes ahead of time, loading the langcodes data in the process."""
+    for code in codes:
+        get_display_name(code)
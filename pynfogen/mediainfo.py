@@ -0,0 +1,116 @@
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+from pymediainfo import MediaInfo
+
+from pynfogen.cache import Cache, file_key
+from pynfogen.config import config
+from pynfogen.timing import span
+
+cache = Cache("media_info")
+
+MODES = ("full", "fast")
+FAST_PARSE_SPEED = 0.1  # MediaInfo's default is 0.5, up to 1 to read the entire file
+GENERAL_FIELDS = ("complete_name", "format", "file_size", "duration", "imdb", "tmdb", "tvdb")
+# fields a fast probe may not find but a full parse does, if a track is missing one the file is parsed in full
+# instead. They are only checked for the formats MediaInfo measures them in by reading more of the stream, as
+# other files, e.g., MKV web encodes without encoder settings, often lack them after a full parse too. Bit rates
+# are not listed for the same reason, lossless audio and MKVs without statistics tags never have them.
+ANALYSED_FIELDS = {
+    "Video": ("bit_rate_mode", "frame_rate_mode")
+}
+ANALYSED_FORMATS = ("MPEG-PS", "MPEG-TS", "BDAV")  # general formats ANALYSED_FIELDS are checked for
+
+
+def get_media_info(file: Path, mode: Optional[str] = None) -> MediaInfo:
+    """
+    Parse a file with MediaInfo, re-using the result of a previous parse if the file has not changed since.
+    The raw MediaInfo output is cached by file path, size, and modification time.
+
+    The mode is "full" to parse with MediaInfo's default settings, or "fast" to probe it, see `probe`.
+    It defaults to the `media_info.mode` configuration, or "full". A cached full parse is also used
+    by the fast mode.
+    """
+    mode = mode or config.get("media_info", {}).get("mode") or "full"
+    if mode not in MODES:
+        raise ValueError(f"Unknown MediaInfo mode {mode!r}, expected one of {', '.join(MODES)}.")
+
+    key = file_key(file)
+    xml = cache.get(key)
+    if xml is None and mode == "fast":
+        fast_key = file_key(file, "fast")
+        xml = cache.get(fast_key)
+        if xml is None:
+            xml = probe(file)
+            cache.set(fast_key, xml)
+    elif xml is None:
+        with span("media_info.parse"):
+            xml = MediaInfo.parse(file, output="OLDXML")
+        cache.set(key, xml)
+    return MediaInfo(xml)
+
+
+def probe(file: Path) -> str:
+    """
+    Quickly parse a file with MediaInfo, reading less of the file and only keeping the fields pynfogen uses.
+
+    If a track is missing a field that needs deeper analysis, e.g., the bit rate mode, or the HDR
+    format of PQ video, the file is parsed in full instead. Either way only the used fields are kept.
+    """
+    with span("media_info.probe"):
+        xml = scope_xml(MediaInfo.parse(file, output="OLDXML", parse_speed=FAST_PARSE_SPEED))
+    if needs_analysis(MediaInfo(xml)):
+        with span("media_info.parse"):
+            xml = scope_xml(MediaInfo.parse(file, output="OLDXML"))
+    return xml
+
+
+def needs_analysis(media_info: MediaInfo) -> bool:
+    """
+    Check if any track of a fast probe is missing a field that a full parse is known to find, see `ANALYSED_FIELDS`,
+    or is PQ video without an HDR format, which is found in metadata further into the stream.
+    """
+    general = media_info.general_tracks[0] if media_info.general_tracks else None
+    analysed = general is not None and general.format in ANALYSED_FORMATS
+    for track in media_info.tracks:
+        if analysed and any(getattr(track, name) is None for name in ANALYSED_FIELDS.get(track.track_type, ())):
+            return True
+        if track.track_type == "Video" and not track.hdr_format and (
+            "PQ" in (track.transfer_characteristics or "") or "2084" in (track.transfer_characteristics or "")
+        ):
+            return True
+    return False
+
+
+def get_used_fields() -> Dict[str, Set[str]]:
+    """Get the MediaInfo field names pynfogen uses, by track type. Menu tracks are not listed, all are used."""
+    from pynfogen.tracks import Audio, Subtitle, Video
+
+    def names(fields: Set[str]) -> Set[str]:
+        # repeated fields, e.g., bit_rate and other_bit_rate, are both from the bit_rate element
+        return {x[len("other_"):] if x.startswith("other_") else x for x in fields}
+
+    return {
+        "General": names(set(GENERAL_FIELDS)),
+        "Video": names(set(Video.DATA.fields())),
+        "Audio": names(set(Audio.DATA.fields())),
+        "Text": names(set(Subtitle.DATA.fields()))
+    }
+
+
+def scope_xml(xml: str) -> str:
+    """Remove the fields pynfogen does not use from MediaInfo OLDXML output, see `get_used_fields`."""
+    used = get_used_fields()
+    root = ET.fromstring(xml)
+    for track in root.iter("track"):
+        fields = used.get(track.attrib.get("type", ""))
+        if fields is None:
+            continue
+        for element in list(track):
+            name = element.tag.lower().strip().strip("_")  # the same as pymediainfo.Track's attribute names
+            if name == "id":
+                name = "track_id"
+            if name not in fields:
+                track.remove(element)
+    return ET.tostring(root, encoding="unicode")
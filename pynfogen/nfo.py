@@ -1,47 +1,130 @@
+from __future__ import annotations
+
+import asyncio
 import re
+import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from string import Formatter
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Set, Union
 
-import langcodes
 import requests
-from imdb import IMDb
-from pymediainfo import MediaInfo
-from tldextract import tldextract
-
-from pynfogen.formatter import CustomFormats
+from tldextract import TLDExtract
+
+from pynfogen.cache import Cache
+from pynfogen.directory import SeasonInfo, directory_index
+from pynfogen.formatter import CustomFormats, split_field_name
+from pynfogen.helpers import cached_property
+from pynfogen.languages import closest_supported_match
+from pynfogen.mediainfo import get_media_info
+from pynfogen.timing import span
 from pynfogen.tracks import Audio, Subtitle, Video
 
+if TYPE_CHECKING:
+    from imdb.Movie import Movie
+
+imdb_cache = Cache("imdb")
+fanart_cache = Cache("fanart")
+# uses the Public Suffix List snapshot bundled with tldextract, never fetching or caching a newer copy
+tld_extractor = TLDExtract(suffix_list_urls=(), cache_dir=None)
+
 
 class NFO:
     IMDB_ID_T = re.compile(r"^tt\d{7,8}$")
     TMDB_ID_T = re.compile(r"^(tv|movie)/\d+$")
     TVDB_ID_T = re.compile(r"^\d+$")
+    IMDB_CACHE_TTL = 60 * 60 * 24 * 7  # a week
+    IMDB_CACHE_MAX_ENTRIES = 1000
+    FANART_REVALIDATE_AFTER = 60 * 60  # an hour
 
     def __init__(self, file: Path, imdb: str, **config: Any) -> None:
-        self.session = self.get_session()
+        with span("nfo.set_config"):
+            self.set_config(file, imdb, **config)
+        with span("nfo.load_media_info"):
+            self.load_media_info()
+
+    @classmethod
+    async def create(cls, file: Path, imdb: str, fields: Optional[Iterable[str]] = None, **config: Any) -> NFO:
+        """
+        Asynchronously create an NFO, identical to calling the constructor.
+
+        The IMDb lookup, preview scrape, and MediaInfo parse (followed by the Fanart.tv lookup
+        which depends on it) run concurrently in the event loop's default executor. If fields
+        are provided, e.g., from `get_template_fields`, only the lookups they use are made.
+        """
+        loop = asyncio.get_running_loop()
+        nfo = cls.__new__(cls)
+        nfo.set_config(file, imdb, **config)
+
+        def load_media_info() -> None:
+            nfo.load_media_info()
+            if fields is None or "banner_image" in fields:
+                nfo.banner_image
+
+        def load_preview_images() -> None:
+            # the Fanart.tv lookup uses the NFO's session at the same time, and sessions are not thread-safe
+            with span("nfo.preview"), nfo.copy_session(nfo.session) as session:
+                nfo.__dict__["preview_images"] = nfo.get_preview_images(nfo.preview, session)
+
+        tasks = [loop.run_in_executor(None, load_media_info)]
+        if fields is None or "imdb" in fields:
+            tasks.append(loop.run_in_executor(None, getattr, nfo, "imdb"))
+        if fields is None or "preview_images" in fields:
+            tasks.append(loop.run_in_executor(None, load_preview_images))
+        await asyncio.gather(*tasks)
+        return nfo
+
+    def set_config(self, file: Path, imdb: str, **config: Any) -> None:
+        """Set and validate the configuration, without doing any I/O."""
+        self.session: requests.Session = config.get("session") or self.get_session()
 
         self.file = file
-        self.media_info = MediaInfo.parse(self.file)
 
         self.fanart_api_key: str = config.get("fanart_api_key")
         self.source: str = config.get("source")
         self.note: str = config.get("note")
         self.preview: str = config.get("preview")
+        self.refresh: bool = bool(config.get("refresh"))
+        self.offline: bool = bool(config.get("offline"))
+        self.media_info_mode: Optional[str] = config.get("media_info_mode")  # see get_media_info
+        imdb_ttl, imdb_max_entries = config.get("imdb_ttl"), config.get("imdb_max_entries")
+        self.imdb_ttl = float(self.IMDB_CACHE_TTL if imdb_ttl is None else imdb_ttl)
+        self.imdb_max_entries = int(self.IMDB_CACHE_MAX_ENTRIES if imdb_max_entries is None else imdb_max_entries)
 
         self.season: Union[int, str] = config.get("season")
         self.episode, self.episode_name = config.get("episode") or (None, None)
+
+        if not imdb:
+            raise ValueError("An IMDB ID is required, but none were provided.")
+        if not self.IMDB_ID_T.match(imdb):
+            raise ValueError(
+                f"The provided IMDB ID `{imdb!r}` is not valid. "
+                f"Expected e.g., 'tt0487831', 'tt10810424', (i.e., include the 'tt')."
+            )
+        self.imdb_id = imdb
+
+        self.tmdb = config.get("tmdb")
+        self.tvdb = config.get("tvdb")
+
+    def load_media_info(self) -> None:
+        """
+        Parse the file with MediaInfo and set the track, chapter, and database ID information from it.
+        Only the information pynfogen uses is kept, the MediaInfo parse is released once this returns.
+        """
+        media_info = get_media_info(self.file, self.media_info_mode)
+        general = media_info.general_tracks[0].to_data()
+
         self.episodes: int = self.get_episode_count()
 
-        self.videos = [Video(x, self.file) for x in self.media_info.video_tracks]
-        self.audio = [Audio(x, self.file) for x in self.media_info.audio_tracks]
-        self.subtitles = [Subtitle(x, self.file) for x in self.media_info.text_tracks]
+        self.videos = [Video(x, self.file) for x in media_info.video_tracks]
+        self.audio = [Audio(x, self.file) for x in media_info.audio_tracks]
+        self.subtitles = [Subtitle(x, self.file) for x in media_info.text_tracks]
         self.language = next((
             lang.language
             for lang in sorted(self.audio + self.subtitles, key=lambda x: x.streamorder)  # type: ignore
             if lang.language
         ), "en")  # defaults to English
 
-        chapters = next(iter(self.media_info.menu_tracks), None)
+        chapters = next(iter(media_info.menu_tracks), None)
         if chapters:
             self.chapters = {
                 ".".join([k.replace("_", ".")[:-3], k[-3:]]): v.strip(":")
@@ -56,119 +139,241 @@ class NFO:
             self.chapters = {}
             self.chapters_numbered = False
 
-        if not imdb:
-            raise ValueError("An IMDB ID is required, but none were provided.")
-        if not self.IMDB_ID_T.match(imdb):
-            raise ValueError(
-                f"The provided IMDB ID `{imdb!r}` is not valid. "
-                f"Expected e.g., 'tt0487831', 'tt10810424', (i.e., include the 'tt')."
-            )
-        self.imdb = IMDb().get_movie(imdb.strip("tt"))
-
-        self.tmdb = config.get("tmdb")
         if not self.tmdb:
-            self.tmdb = self.media_info.general_tracks[0].to_data().get("tmdb")
+            self.tmdb = general.get("tmdb")
         if self.tmdb and not self.TMDB_ID_T.match(self.tmdb):
             raise ValueError(
                 f"The provided TMDB ID {self.tmdb!r} is not valid. "
                 f"Expected e.g., 'tv/2490', 'movie/14836', (i.e., include the 'tv/' or 'movie/')."
             )
 
-        self.tvdb = config.get("tvdb")
         if not self.tvdb:
-            self.tvdb = self.media_info.general_tracks[0].to_data().get("tvdb")
+            self.tvdb = general.get("tvdb")
         if self.tvdb and not self.TVDB_ID_T.match(str(self.tvdb)):
             raise ValueError(
                 f"The provided TVDB ID {self.tvdb!r} is not valid. "
                 f"Expected e.g., '79216', '1395', (not the url slug e.g., 'the-office-us')."
             )
 
-        if self.tvdb and self.fanart_api_key:
-            self.banner_image = self.get_banner_image(self.tvdb)
-        else:
-            self.banner_image = None
-
-        if self.preview:
-            self.preview_images = self.get_preview_images(self.preview)
-        else:
-            self.preview_images = []
-
     def __repr__(self) -> str:
         return "<{c} {attrs}>".format(
             c=self.__class__.__name__,
             attrs=" ".join("{}={!r}".format(k, v) for k, v in self.__dict__.items()),
         )
 
+    @cached_property
+    def imdb(self) -> Movie:
+        """IMDb title information."""
+        with span("nfo.imdb"):
+            return self.get_imdb(self.imdb_id)
+
+    @cached_property
+    def banner_image(self) -> Optional[str]:
+        """Fanart.tv wide banner image URL, if available."""
+        with span("nfo.fanart"):
+            return self.get_banner_image(self.tvdb) if self.fanart_api_key else None
+
+    @cached_property
+    def preview_images(self) -> List[Dict[str, str]]:
+        """Preview gallery thumbnail and full image URLs."""
+        with span("nfo.preview"):
+            return self.get_preview_images(self.preview)
+
+    @cached_property
+    def season_info(self) -> SeasonInfo:
+        """Season episode files, total size, and episode numbering gaps."""
+        with span("nfo.season_info"):
+            return directory_index.get_season_info(self.file)
+
+    @cached_property
+    def videos_pretty(self) -> List[List[str]]:
+        """Video tracks as string representations."""
+        return self.get_video_print(self.videos)
+
+    @cached_property
+    def audio_pretty(self) -> List[str]:
+        """Audio tracks as string representations."""
+        return self.get_audio_print(self.audio)
+
+    @cached_property
+    def subtitles_pretty(self) -> List[str]:
+        """Subtitle tracks as string representations."""
+        return self.get_subtitle_print(self.subtitles)
+
+    @cached_property
+    def chapters_yes_no(self) -> str:
+        """Whether there's chapters, and if so, if named or numbered."""
+        return self.get_chapter_print_short(self.chapters)
+
+    @cached_property
+    def chapters_named(self) -> bool:
+        """Whether there's chapters, and they are named."""
+        return bool(self.chapters) and not self.chapters_numbered
+
+    @cached_property
+    def chapter_entries(self) -> List[str]:
+        """Chapters as string representations."""
+        return self.get_chapter_print(self.chapters)
+
+    @cached_property
+    def scan_entries(self) -> List[str]:
+        """Per-VOB and per-cell scan types of the first video track as string representations."""
+        return self.get_scan_print(self.videos[0] if self.videos else None)
+
     def run(self, template: str, art: Optional[str] = None, **kwargs: Any) -> str:
         """
         Evaluate and apply formatting on template, apply any art if provided.
         Any additional parameters are passed as extra variables to the template.
         The extra variables have priority when there's conflicting variable names.
+
+        Only the variables used by the template are evaluated, so lookups like the IMDb
+        title or preview images are only made if the template uses them.
         """
-        variables = self.__dict__
-        variables.update(kwargs)
-
-        template = CustomFormats().format(template, **variables)
-        if art:
-            art = art.format(nfo=template)
-            template = art
-
-        for m in re.finditer(r"<\?([01])\?([\D\d]*?)\?>", template):
-            # TODO: This if check is quite yucky, look into alternative options.
-            #       Ideally a custom format spec would be great.
-            template = template.replace(
-                m.group(0),
-                m.group(2) if int(m.group(1)) else ""
-            )
+        with span("nfo.variables"):
+            variables = self.get_variables(template, **kwargs)
+
+        with span("nfo.format"):
+            formatter = CustomFormats()
+            template = formatter.format(template, **variables)
+            if art:
+                template = formatter.format(art, nfo=template)
 
         template = "\n".join(map(str.rstrip, template.splitlines(keepends=False)))
 
         return template
 
+    def get_variables(self, template: str, **kwargs: Any) -> Dict[str, Any]:
+        """
+        Evaluate the variables used by a template, see `run`.
+        Any additional parameters are extra variables, and have priority over the NFO's variables.
+        """
+        variables = {}
+        for name in self.get_template_fields(template):
+            if name in kwargs:
+                variables[name] = kwargs[name]
+            elif name in self.__dict__ or isinstance(getattr(type(self), name, None), cached_property):
+                variables[name] = getattr(self, name)
+        return variables
+
+    @staticmethod
+    def get_template_fields(template: str) -> Set[str]:
+        """Get the names of all variables used by a template, including any used within format specs."""
+        fields = set()
+        for _, field_name, format_spec, _ in Formatter().parse(template):
+            if field_name:
+                name, _ = split_field_name(field_name)
+                if isinstance(name, str):
+                    fields.add(name)
+            if format_spec and "{" in format_spec:
+                fields |= NFO.get_template_fields(format_spec)
+        return fields
+
     def get_episode_count(self) -> int:
-        """Count episodes based on neighbouring same-extension files."""
-        return sum(1 for _ in self.file.parent.glob(f"*{self.file.suffix}"))
+        """Count episodes based on neighbouring same-extension files, see `season_info`."""
+        return len(self.season_info.files)
+
+    def get_imdb(self, imdb_id: str) -> Movie:
+        """
+        Get the IMDb title, re-using a locally cached copy if it has not expired.
+        The cache is skipped when refreshing, and only the cache is used when offline, even if expired.
+        """
+        movie = None
+        if not self.refresh:
+            movie = imdb_cache.get(imdb_id, max_age=None if self.offline else self.imdb_ttl)
+        if movie is None:
+            if self.offline:
+                raise ValueError(f"No cached IMDb data for {imdb_id} is available while offline.")
+            from imdb import IMDb  # cinemagoer is slow to import, so only import it once needed
+
+            movie = IMDb().get_movie(imdb_id.strip("tt"))
+            imdb_cache.set(imdb_id, movie)
+            # expired titles are kept, as offline runs re-use them, until there are too many
+            imdb_cache.prune(max_entries=self.imdb_max_entries)
+        return movie
 
     def get_banner_image(self, tvdb_id: int) -> Optional[str]:
         """
         Get a wide banner image from fanart.tv.
         It will only return banners in the same language as the first audio track.
+
+        The Fanart.tv response is cached per-TVDB ID and is only revalidated, using ETag and
+        Last-Modified, once FANART_REVALIDATE_AFTER seconds have passed since it was last checked.
+        The chosen banner is cached per-language until the response changes.
         """
         if not tvdb_id:
             return None
         if not self.fanart_api_key:
             raise ValueError("Need Fanart.tv api key for TV titles!")
 
-        r = self.session.get(f"http://webservice.fanart.tv/v3/tv/{tvdb_id}?api_key={self.fanart_api_key}")
-        if r.status_code == 404:
+        key = str(tvdb_id)
+        cached = None if self.refresh else fanart_cache.get(key)
+        if cached and (self.offline or time.time() - cached["validated"] < self.FANART_REVALIDATE_AFTER):
+            entry = cached
+        elif self.offline:
             return None
-        res = r.json()
+        else:
+            headers = {}
+            if cached and cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached and cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+            r = self.session.get(
+                f"http://webservice.fanart.tv/v3/tv/{tvdb_id}?api_key={self.fanart_api_key}",
+                headers=headers
+            )
+            if cached and r.status_code == 304:
+                entry = cached
+            elif r.status_code == 404:
+                entry = dict(etag=None, last_modified=None, data=None, banners={})
+            else:
+                res = r.json()
+                error = res.get("error message")
+                if error and error != "Not found":
+                    raise ValueError(f"An unexpected error occurred while calling Fanart.tv, {res}")
+                entry = dict(
+                    etag=r.headers.get("ETag"),
+                    last_modified=r.headers.get("Last-Modified"),
+                    data=None if error else res,
+                    banners={}
+                )
+            entry["validated"] = time.time()
+            fanart_cache.set(key, entry)
 
-        error = res.get("error message")
-        if error:
-            if error == "Not found":
-                return None
-            raise ValueError(f"An unexpected error occurred while calling Fanart.tv, {res}")
+        if not entry["data"]:
+            return None
 
-        url = next((
-            x["url"]
-            for x in res.get("tvbanner") or []
-            if langcodes.closest_supported_match(x["lang"], [self.language], 5)
-        ), None)
+        # `language` is the display name, but Fanart.tv banners are matched by language code
+        language = next((
+            track.language_code
+            for track in sorted(self.audio + self.subtitles, key=lambda x: x.streamorder)  # type: ignore
+            if track.language_code
+        ), "en")  # defaults to English
+        if language not in entry["banners"]:
+            entry["banners"][language] = next((
+                x["url"]
+                for x in entry["data"].get("tvbanner") or []
+                if closest_supported_match(x["lang"], (language,), 5)
+            ), None)
+            fanart_cache.set(key, entry)
 
-        return url
+        return entry["banners"][language]
 
-    def get_preview_images(self, url: str) -> List[Dict[str, str]]:
-        if not url:
+    def get_preview_images(self, url: str, session: Optional[requests.Session] = None) -> List[Dict[str, str]]:
+        """
+        Get the thumbnail and full image URLs of a supported image host's gallery or album.
+        The session defaults to the NFO's session.
+        """
+        if not url or self.offline:
             return []
 
-        domain = tldextract.extract(url).registered_domain
+        domain = tld_extractor(url).registered_domain
         supported_domains = ["imgbox.com", "beyondhd.co"]
         if domain not in supported_domains:
             return []
 
         images = []
-        page = self.session.get(url).text
+        page = (session or self.session).get(url).text
         if domain == "imgbox.com":
             for m in re.finditer('src="(https://thumbs2.imgbox.com.+/)(\\w+)_b.([^"]+)', page):
                 images.append({
@@ -190,20 +395,22 @@ class NFO:
         if not videos:
             return [["--"]]
 
+        formatter = CustomFormats()
         data = []
         for v in videos:
+            properties = v.all_properties
             data.append([
-                CustomFormats().vformat(
+                formatter.vformat(
                     "- <?{language:true}?{language}, ?>{codec} ({profile}) "
                     "{width}x{height} ({dar}) @ {bitrate}<?{bit_rate_mode:true}? ({bit_rate_mode})?>",
                     args=[],
-                    kwargs=v.all_properties
+                    kwargs=properties
                 ),
-                CustomFormats().vformat(
+                formatter.vformat(
                     "  {fps} FPS ({frame_rate_mode}), {color_space} {chroma_subsampling} {bit_depth}bps, "
                     "{range}, {scan}",
                     args=[],
-                    kwargs=v.all_properties
+                    kwargs=properties
                 )
             ])
 
@@ -215,9 +422,10 @@ class NFO:
         if not audio:
             return ["--"]
 
+        formatter = CustomFormats()
         data = []
         for a in audio:
-            data.append(CustomFormats().vformat(
+            data.append(formatter.vformat(
                 "- <?{language:true}?{language}, ?><?{title:true}?, {title}?>, {codec} {channels} @ "
                 "{bitrate}<?{bit_rate_mode:true}? ({bit_rate_mode})?>",
                 args=[],
@@ -245,9 +453,10 @@ class NFO:
         if not subtitles:
             return ["--"]
 
+        formatter = CustomFormats()
         data = []
         for s in subtitles:
-            data.append(CustomFormats().vformat(
+            data.append(formatter.vformat(
                 "- {title}, {codec}",
                 args=[],
                 kwargs=s.all_properties
@@ -255,6 +464,31 @@ class NFO:
 
         return data
 
+    @staticmethod
+    def get_scan_print(video: Optional[Video]) -> List[str]:
+        """
+        Get the scan type of each VOB, and each cell within it, as string representations.
+        Only MPEG-1/2 video has this information, see `Video.scan_cells`.
+
+        e.g.
+        - VOB 1: 99.78% Progressive (VST)
+          - Cell 1: Progressive (CST)
+          - Cell 2: 98.12% Progressive (VST)
+        """
+        if not video or not video.scan_cells:
+            return ["--"]
+
+        data = []
+        for vob, stats in video.scan_vobs.items():
+            data.append(f"- VOB {vob}: {stats.scan_type}")
+            data.extend(
+                f"  - Cell {cell}: {cell_stats.scan_type}"
+                for (cell_vob, cell), cell_stats in video.scan_cells.items()
+                if cell_vob == vob
+            )
+
+        return data
+
     @staticmethod
     def get_chapter_print(chapters: Dict[str, str]) -> List[str]:
         """Get Chapter's as string representations."""
@@ -274,6 +508,23 @@ class NFO:
             return f"Yes (Numbered 01-{str(len(chapters)).zfill(2)})"
         return "Yes (Named)"
 
+    @staticmethod
+    def copy_session(session: requests.Session) -> requests.Session:
+        """
+        Get a new session with the same settings, cookies, and transport adapters as a session, to use it from
+        another thread. The adapters are shared, as their connection pools are thread-safe, unlike sessions.
+        """
+        copy = requests.Session()
+        copy.headers.update(session.headers)
+        copy.cookies.update(session.cookies.copy())
+        copy.auth, copy.verify, copy.cert = session.auth, session.verify, session.cert
+        copy.proxies, copy.params = dict(session.proxies), dict(session.params)
+        copy.trust_env, copy.max_redirects = session.trust_env, session.max_redirects
+        copy.hooks = {event: list(hooks) for event, hooks in session.hooks.items()}
+        for prefix, adapter in session.adapters.items():
+            copy.mount(prefix, adapter)
+        return copy
+
     @staticmethod
     def get_session() -> requests.Session:
         session = requests.Session()
@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, NamedTuple, Optional, Set, Tuple
+
+from pynfogen.config import Files, config
+from pynfogen.timing import span
+
+if TYPE_CHECKING:
+    from pynfogen.nfo import NFO
+
+TEMPLATES = ("movie", "episode", "season")
+# keys of a job from an untrusted source, e.g., `nfo serve` requests, see `parse_job`
+JOB_KEYS = (
+    "file", "template", "imdb", "tmdb", "tvdb", "season", "episode", "title", "artwork", "source", "note", "preview",
+    "encoding", "refresh", "offline", "media_info_mode"
+)
+
+text_files: Dict[Path, Tuple[int, str]] = {}  # contents of template and artwork files, by path
+
+
+class Result(NamedTuple):
+    """The rendered NFO and Description of a job, or the error that stopped it."""
+    job: Dict[str, Any]
+    release_name: str
+    nfo: Optional[str] = None
+    description: Optional[str] = None  # None if the template has no Description template
+    error: Optional[Exception] = None
+
+
+def render(file: Path, imdb: str, template: str, artwork: Optional[str] = None,
+           **config_: Any) -> Tuple[str, Optional[str]]:
+    """
+    Render the NFO and Description of a release, without saving them.
+    Any additional parameters are passed to the NFO constructor.
+
+    The IMDb ID may be "-" to use the one within the file's metadata.
+    Returns the NFO, and the Description if the template has a Description template.
+
+    Raises FileNotFoundError if the file, template, or artwork does not exist, or IsADirectoryError if the
+    file is a folder.
+    """
+    return render_nfo(create_nfo(file, imdb, **config_), template, artwork)
+
+
+def create_nfo(file: Path, imdb: str, **config_: Any) -> NFO:
+    """
+    Create the NFO of a release, using the configured Fanart.tv API key and cache settings, see `render`.
+    The NFO may be rendered with any template and artwork, any number of times, with `render_nfo`.
+    """
+    if not file.exists():
+        raise FileNotFoundError("The provided file path does not exist.")
+    if not file.is_file():
+        raise IsADirectoryError("The provided file path is to a folder, not a file.")
+
+    from pynfogen.mediainfo import get_media_info
+    from pynfogen.nfo import NFO
+
+    if imdb == "-":
+        imdb = get_media_info(file).general_tracks[0].to_data().get("imdb")
+        if not imdb:
+            raise ValueError("No IMDB ID was found within the file's metadata.")
+
+    cache_config = config.get("cache", {})
+    return NFO(
+        file,
+        imdb,
+        fanart_api_key=config.get("fanart_api_key"),
+        imdb_ttl=cache_config.get("imdb_ttl"),
+        imdb_max_entries=cache_config.get("imdb_max_entries"),
+        **config_
+    )
+
+
+def render_nfo(nfo: NFO, template: str, artwork: Optional[str] = None) -> Tuple[str, Optional[str]]:
+    """
+    Render the NFO and Description of an NFO with a template and artwork, see `render`.
+    Raises FileNotFoundError if the template or artwork does not exist.
+    """
+    artwork_text = None
+    if artwork:
+        artwork_path = Path(str(Files.artwork).format(name=artwork))
+        if not artwork_path.exists():
+            raise FileNotFoundError(f"No artwork named {artwork} exists.")
+        artwork_text = read_text(artwork_path)
+
+    template_path, description_path = get_template_paths(template)
+    if not template_path.exists():
+        raise FileNotFoundError(f"No template named {template} exists.")
+    template_text = read_text(template_path)
+
+    with span("render.nfo"):
+        nfo_txt = nfo.run(template_text, art=artwork_text)
+
+    description_txt = None
+    if description_path.exists():
+        with span("render.description"):
+            description_txt = nfo.run(read_text(description_path), art=None)
+
+    return nfo_txt, description_txt
+
+
+def get_template_paths(template: str) -> Tuple[Path, Path]:
+    """Get the paths of the NFO template and Description template of a template name."""
+    return (
+        Path(str(Files.template).format(name=template)),
+        Path(str(Files.description).format(name=template))
+    )
+
+
+def render_job(job: Dict[str, Any]) -> Result:
+    """Render a single job, returning any error it raised within the Result, see `render_many`."""
+    release_name = Path(job.get("file") or "").name
+    try:
+        file, template, config_ = parse_job(job)
+        release_name = get_release_name(file, template) or file.name
+        nfo, description = render(file, template=template, **config_)
+    except Exception as e:  # any failure is returned rather than stopping the other jobs
+        return Result(job, release_name, error=e)
+    return Result(job, release_name, nfo, description)
+
+
+def render_many(jobs: Iterable[Dict[str, Any]], workers: int = 4, max_pending: Optional[int] = None
+                ) -> Iterator[Result]:
+    """
+    Render many jobs concurrently, yielding each Result as it completes.
+
+    Each job is a dictionary in the same format as a `nfo generate-many` manifest line, e.g.,
+    {"file": "a.mkv", "imdb": "tt0487831", "template": "movie"}. Any other keys are passed to
+    the NFO constructor. Failed jobs are yielded with their error rather than raised.
+
+    Jobs are only taken from the iterable as results are consumed, with up to `max_pending`
+    (twice the workers by default) submitted at once, so jobs can be lazily produced and results
+    are never buffered faster than they are consumed.
+
+    Example:
+        >>> for result in render_many({"file": str(f), "template": "episode", "episode": i} for i, f in ...):
+        ...     if result.error:
+        ...         print(result.release_name, "failed:", result.error)
+        ...     else:
+        ...         store(result.release_name, result.nfo, result.description)
+    """
+    max_pending = max(max_pending or workers * 2, 1)
+    jobs = iter(jobs)
+    pending: Set[Future] = set()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        try:
+            while True:
+                for job in jobs:
+                    pending.add(pool.submit(render_job, job))
+                    if len(pending) >= max_pending:
+                        break
+                if not pending:
+                    return
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            # the consumer stopped early, so don't start the jobs it no longer wants
+            for future in pending:
+                future.cancel()
+
+
+def save_files(file: Path, template: str, nfo_txt: str, description_txt: Optional[str],
+               encoding: str = "utf8") -> Dict[str, Path]:
+    """Save a rendered NFO and Description next to the release file, e.g., `render`'s result."""
+    release_name = get_release_name(file, template)
+    saved = {}
+
+    with span("generate.write"):
+        nfo_out = file.parent / f"{release_name}.nfo"
+        nfo_out.write_text(nfo_txt, encoding=encoding, errors="unidecode")
+        saved["NFO"] = nfo_out
+
+        if description_txt is not None:
+            description_out = file.parent / f"{release_name}.desc.txt"
+            description_out.write_text(description_txt, encoding=encoding, errors="unidecode")
+            saved["Description"] = description_out
+
+    return saved
+
+
+def init_worker() -> None:
+    """Prepare a worker process or thread, as it may not share the state set up by the CLI's group callback."""
+    import codecs
+
+    from pynfogen.helpers import unidecode_error_handler
+    from pynfogen.languages import prewarm
+
+    codecs.register_error("unidecode", unidecode_error_handler)
+    prewarm()
+
+
+def run_job(job: Dict[str, Any], **config_: Any) -> Tuple[str, Dict[str, Path], Optional[str]]:
+    """
+    Generate and save the files of a single job, e.g., within a worker process.
+    Any additional parameters are passed to the NFO constructor, e.g., a session to re-use.
+    Returns the release name, the saved files, and an error message if it failed.
+    """
+    release_name = Path(job.get("file") or "").name
+    try:
+        file, template, job_config = parse_job(job)
+        release_name = get_release_name(file, template) or file.name
+        encoding = job_config.pop("encoding", None) or "utf8"
+        nfo_txt, description_txt = render(file, template=template, **job_config, **config_)
+        saved = save_files(file, template, nfo_txt, description_txt, encoding)
+    except Exception as e:  # any failure is reported rather than stopping the other jobs
+        return release_name, {}, str(e) or e.__class__.__name__
+
+    return release_name, saved, None
+
+
+def parse_job(job: Dict[str, Any]) -> Tuple[Path, str, Dict[str, Any]]:
+    """
+    Get the file, template, and NFO configuration of a job.
+    Episode jobs have their "episode" and "title" combined into the NFO's episode configuration.
+    """
+    config_ = dict(job)
+    file = Path(config_.pop("file"))
+    template = config_.pop("template", None) or "movie"
+    season, episode, title = config_.pop("season", None), config_.pop("episode", None), config_.pop("title", None)
+    config_.setdefault("imdb", "-")
+
+    if template not in TEMPLATES:
+        raise ValueError(f"Unknown template {template!r}, expected one of {', '.join(TEMPLATES)}.")
+    if config_.get("artwork") is not None and not is_plain_name(config_["artwork"]):
+        raise ValueError(f"Invalid artwork name {config_['artwork']!r}, it must be a name, not a path.")
+    if isinstance(season, str) and season.isdigit():
+        season = int(season)
+    if template in ("season", "episode"):
+        config_["season"] = season
+    if template == "episode":
+        if episode is None:
+            raise ValueError("An episode number is required for episode releases.")
+        config_["episode"] = (int(episode), title or None)
+
+    return file, template, config_
+
+
+def is_plain_name(name: Any) -> bool:
+    """Check if a template or artwork name is a plain name, without path separators or `..`."""
+    return isinstance(name, str) and bool(name) and not any(x in name for x in ("/", "\\", ".."))
+
+
+def get_release_name(file: Path, template: str) -> str:
+    """Get the release name for a file, as used by the generated file names."""
+    return {
+        "season": file.parent.name,
+        "episode": file.stem,
+        "movie": file.stem
+    }[template]
+
+
+def read_text(path: Path) -> str:
+    """
+    Read a UTF-8 template or artwork file, re-using the contents from a previous read if it has not changed since.
+    This keeps them in memory for long-running processes like `nfo serve`.
+    """
+    mtime_ns = path.stat().st_mtime_ns
+    cached = text_files.get(path)
+    if cached is None or cached[0] != mtime_ns:
+        cached = text_files[path] = (mtime_ns, path.read_text(encoding="utf8"))
+    return cached[1]
@@ -0,0 +1,154 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from pyd2v import D2V
+
+PROGRESSIVE_FRAME = 0x40  # bit of a D2V frame flag byte that marks the frame as progressive
+MIN_CHUNK_SIZE = 1024 * 1024  # smallest amount of D2V flag data worth handing to another process
+
+CellCounts = Dict[Tuple[int, int], Tuple[int, int]]  # (progressive frames, total frames) by (vob id, cell id)
+
+
+class ScanStats(NamedTuple):
+    """Progressive frame statistics of a video, or a section of it."""
+    progressive: int
+    total: int
+
+    @property
+    def interlaced(self) -> int:
+        """Amount of interlaced frames."""
+        return self.total - self.progressive
+
+    @property
+    def percent(self) -> float:
+        """Percentage of frames that are progressive."""
+        if not self.total:
+            return 0.0
+        return (self.progressive / self.total) * 100
+
+    @property
+    def scan_type(self) -> str:
+        """
+        Get scan type in string form, e.g., 'Interlaced (CST)' or '99.78% Progressive (VST)'.
+        CST (constant scan type) is used when every frame has the same scan type, otherwise VST (variable).
+        """
+        percent = self.percent
+        is_constant = percent in (0.0, 100.0)
+        scan_type = ["Interlaced", "Progressive"][percent >= 50.0]
+        scan_type += f" ({['VST', 'CST'][is_constant]})"
+        if not is_constant:
+            scan_type = f"{percent:.2f}% {scan_type}"
+        return scan_type
+
+    def __add__(self, other: object) -> "ScanStats":
+        if not isinstance(other, ScanStats):
+            return NotImplemented
+        return ScanStats(self.progressive + other.progressive, self.total + other.total)
+
+
+def get_scan_stats(file: Path, jobs: Optional[int] = None) -> Dict[Tuple[int, int], ScanStats]:
+    """
+    Index an MPEG-1/2 file with DGIndex and get the progressive frame statistics of each cell,
+    keyed by VOB ID and Cell ID. The D2V and any files demuxed to create it are deleted after.
+
+    The D2V's flag data is streamed rather than parsed in its entirety, and large D2Vs are
+    split into chunks that are counted in parallel by up to `jobs` processes.
+
+    The D2V is created with pyd2v's private `D2V._get_d2v`, as its public `D2V.load` also parses
+    every frame's flags into memory, so check that it still exists when updating pyd2v.
+    """
+    d2v_path = D2V._get_d2v(file)
+    try:
+        counts = count_flags_parallel(d2v_path, jobs)
+    finally:
+        for ext in ("log", "d2v", "mpg", "mpeg"):
+            d2v_path.with_suffix(f".{ext}").unlink(missing_ok=True)
+    return {cell: ScanStats(*counts[cell]) for cell in sorted(counts)}
+
+
+def count_flags_parallel(d2v_path: Path, jobs: Optional[int] = None) -> CellCounts:
+    """
+    Count the progressive frames of each cell of a D2V, splitting the flag data across processes.
+    The flag data is counted serially when run from a daemonic process, e.g., a worker of `generate-many`,
+    as those may not have child processes.
+    """
+    start, end = get_flag_data_range(d2v_path)
+    jobs = jobs or os.cpu_count() or 1
+    chunks = min(jobs, max((end - start) // MIN_CHUNK_SIZE, 1))
+    if multiprocessing.current_process().daemon:
+        chunks = 1
+
+    bounds = [start]
+    with d2v_path.open("rb") as f:
+        for i in range(1, chunks):
+            # align each boundary to the start of the next line
+            f.seek(start + ((end - start) * i // chunks) - 1)
+            f.readline()
+            bounds.append(min(f.tell(), end))
+    bounds.append(end)
+    ranges = [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1) if bounds[i] < bounds[i + 1]]
+
+    if len(ranges) <= 1:
+        return count_flags(d2v_path, start, end)
+
+    counts: CellCounts = {}
+    with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+        starts, ends = zip(*ranges)
+        for result in pool.map(count_flags, [d2v_path] * len(ranges), starts, ends):
+            for cell, (progressive, total) in result.items():
+                p, t = counts.get(cell, (0, 0))
+                counts[cell] = (p + progressive, t + total)
+    return counts
+
+
+def get_flag_data_range(d2v_path: Path) -> Tuple[int, int]:
+    """
+    Get the start and end byte offsets of a D2V's flag data.
+    The flag data follows the video list and settings, each of which end with an empty line.
+    """
+    with d2v_path.open("rb") as f:
+        if not f.readline().startswith(b"DGIndexProjectFile"):
+            raise ValueError(f"{d2v_path} is not a D2V file.")
+        sections = 0
+        while sections < 2:
+            line = f.readline()
+            if not line:
+                raise ValueError(f"{d2v_path} has no flag data.")
+            if not line.strip():
+                sections += 1
+        start = f.tell()
+        while True:
+            line = f.readline()
+            if not line.strip():
+                break
+        end = f.tell() - len(line)
+    return start, end
+
+
+def count_flags(d2v_path: Path, start: int, end: int) -> CellCounts:
+    """
+    Count the progressive frames of each cell within a byte range of a D2V's flag data.
+    Each line is a GOP, with the VOB ID and Cell ID as the 6th and 7th values, followed by a flag byte per-frame.
+    """
+    counts: CellCounts = {}
+    with d2v_path.open("rb") as f:
+        f.seek(start)
+        while f.tell() < end:
+            line = f.readline()
+            if not line.strip():
+                break
+            values = line.split(maxsplit=7)
+            flags: List[bytes] = values[7].split()
+            if flags[-1].lower() == b"ff":
+                # ff == end of stream indicator, not an actual frame data byte
+                flags.pop()
+            cell = (int(values[5]), int(values[6]))
+            progressive, total = counts.get(cell, (0, 0))
+            counts[cell] = (
+                progressive + sum(1 for flag in flags if int(flag, 16) & PROGRESSIVE_FRAME),
+                total + len(flags)
+            )
+    return counts
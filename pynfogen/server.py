@@ -0,0 +1,185 @@
+import ipaddress
+import json
+import socket
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Type
+from urllib.parse import urlsplit
+
+from pynfogen.nfo import NFO
+from pynfogen.rendering import JOB_KEYS, init_worker, is_plain_name, run_job
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8053
+DEFAULT_WORKERS = 4
+
+
+class GenerateHandler(BaseHTTPRequestHandler):
+    """
+    Handle generate requests for `nfo serve`.
+
+    POST /generate with a JSON object in the same format as a `nfo generate-many` manifest line,
+    e.g., {"file": "/media/a.mkv", "imdb": "tt0487831", "template": "movie", "artwork": "phoenix"}.
+    The IMDb ID defaults to the one within the file's metadata.
+    Responds with the release name and saved files, or an error message.
+
+    As web pages can send requests to local addresses, requests must be sent as `application/json`,
+    which browsers only do cross-origin after a preflight the server never answers, must not have an
+    Origin header, and must have a Host header of the address the server is bound to, which a DNS
+    rebinding attack cannot forge.
+    """
+    server_version = "pynfogen"
+    sessions = threading.local()
+
+    def do_GET(self) -> None:
+        if self.path != "/":
+            return self.respond(404, {"error": "Not found."})
+        self.respond(200, {"status": "ok"})
+
+    def do_POST(self) -> None:
+        if self.path != "/generate":
+            return self.respond(404, {"error": "Not found."})
+        if not self.is_bound_host(self.headers.get("Host") or ""):
+            return self.respond(403, {"error": "The Host header does not match the server's address."})
+        if self.headers.get("Origin") is not None:
+            return self.respond(403, {"error": "Requests from web pages are not allowed."})
+        content_type = (self.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+        if content_type != "application/json":
+            return self.respond(415, {"error": "Request body must be sent as application/json."})
+        try:
+            job = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)))
+        except ValueError as e:
+            return self.respond(400, {"error": f"Request body is not valid JSON, {e}"})
+        if not isinstance(job, dict) or not job.get("file") or not job.get("template"):
+            return self.respond(400, {"error": "Request must be an object with a \"file\" and \"template\" key."})
+        unknown = set(job) - set(JOB_KEYS)
+        if unknown:
+            return self.respond(400, {"error": f"Unknown job key(s) {', '.join(sorted(map(repr, unknown)))}."})
+        for key in ("template", "artwork"):
+            if job.get(key) is not None and not is_plain_name(job[key]):
+                return self.respond(400, {"error": f"The {key} must be a name, not a path."})
+
+        # requests are handled by a fixed pool of threads, see PooledHTTPServer, so the HTTP session
+        # and the cache connections of each thread stay warm, as sessions are not thread-safe
+        session = getattr(self.sessions, "session", None)
+        if session is None:
+            session = self.sessions.session = NFO.get_session()
+
+        try:
+            release_name, saved, error = run_job(dict({"imdb": "-"}, **job), session=session)
+        except Exception as e:  # run_job reports job failures itself, this is anything unexpected
+            return self.respond(500, {"error": str(e) or e.__class__.__name__})
+        if error:
+            return self.respond(422, {"release_name": release_name, "error": error})
+        self.respond(200, {"release_name": release_name, "saved": {k: str(v) for k, v in saved.items()}})
+
+    def is_bound_host(self, host: str) -> bool:
+        """
+        Check if a Host header is the address the server is bound to, or localhost if bound to a loopback address.
+        If bound to all addresses, any IP address is allowed, but still no other host names.
+        """
+        address = self.server.server_address
+        if not isinstance(address, tuple):
+            return False
+        bound_host, bound_port = address[:2]
+        try:
+            url = urlsplit(f"//{host}")
+            hostname, port = url.hostname, url.port or 80
+        except ValueError:
+            return False
+        if not hostname or port != bound_port:
+            return False
+        if hostname == str(bound_host).lower():
+            return True
+        bound_ip = ipaddress.ip_address(bound_host)
+        if bound_ip.is_loopback:
+            return hostname == "localhost"
+        if bound_ip.is_unspecified:
+            try:
+                ipaddress.ip_address(hostname)
+            except ValueError:
+                return False
+            return True
+        return False
+
+    def respond(self, status: int, data: Dict[str, Any]) -> None:
+        body = json.dumps(data).encode("utf8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class PooledHTTPServer(HTTPServer):
+    """
+    HTTP server that handles each request on a fixed pool of threads.
+    Unlike ThreadingHTTPServer, which starts a thread per-request, per-thread state like HTTP sessions
+    and SQLite connections is kept between requests.
+    """
+    def __init__(self, server_address: Tuple[str, int], handler: Type[BaseHTTPRequestHandler],
+                 workers: int = DEFAULT_WORKERS):
+        super().__init__(server_address, handler)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pynfogen-serve")
+
+    def process_request(self, request: Any, client_address: Any) -> None:
+        self.pool.submit(self.process_request_thread, request, client_address)
+
+    def process_request_thread(self, request: socket.socket, client_address: Any) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.pool.shutdown(wait=True)
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, workers: int = DEFAULT_WORKERS) -> None:
+    """
+    Serve generate requests until interrupted, generating up to `workers` at a time.
+    Configuration, HTTP sessions, cache connections, templates, artwork, and compiled templates stay
+    loaded between requests.
+    """
+    init_worker()
+    with PooledHTTPServer((host, port), GenerateHandler, workers) as httpd:
+        httpd.serve_forever()
+
+
+def request_generate(address: str, job: Dict[str, Any], timeout: Optional[float] = None
+                     ) -> Tuple[str, Dict[str, Path], Optional[str]]:
+    """
+    Ask an `nfo serve` daemon at address, e.g., '127.0.0.1:8053', to generate the files of a job.
+    Returns the release name, the saved files, and an error message if it failed.
+    """
+    if "://" not in address:
+        address = f"http://{address}"
+    request = urllib.request.Request(
+        f"{address.rstrip('/')}/generate",
+        data=json.dumps(job).encode("utf8"),
+        headers={"Content-Type": "application/json"},
+        method="POST"
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            data = json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        try:
+            data = json.loads(e.read() or b"{}")
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):  # e.g., a proxy's error page
+            return Path(job["file"]).name, {}, f"The server at {address} responded with HTTP {e.code} {e.reason}"
+    except urllib.error.URLError as e:
+        return Path(job["file"]).name, {}, f"Could not connect to the server at {address}, {e.reason}"
+    release_name = data.get("release_name") or Path(job["file"]).name
+    if data.get("error"):
+        return release_name, {}, data["error"]
+    return release_name, {k: Path(v) for k, v in data.get("saved", {}).items()}, None
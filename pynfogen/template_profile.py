@@ -0,0 +1,136 @@
+import time
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from pymediainfo import MediaInfo
+
+from pynfogen.directory import SeasonInfo
+from pynfogen.formatter import CustomFormats, FormatProfile
+from pynfogen.tracks import Audio, Subtitle, Video
+
+# MediaInfo OLDXML of the synthetic release's tracks, so templates may use any property of a real track
+SYNTHETIC_MEDIA_INFO = (
+    '<?xml version="1.0" encoding="UTF-8"?><Mediainfo><File>'
+    '<track type="General"><Format>Matroska</Format><Duration>1440000</Duration></track>'
+    '<track type="Video"><Track_ID>1</Track_ID><StreamOrder>0</StreamOrder><Format>AVC</Format>'
+    '<Format_profile>High@L4.0</Format_profile><Bit_rate>6000000</Bit_rate><Bit_rate>6 000 kb/s</Bit_rate>'
+    '<Bit_rate_mode>Variable</Bit_rate_mode><Width>1920</Width><Height>1080</Height>'
+    '<Display_aspect_ratio>1.778</Display_aspect_ratio><Display_aspect_ratio>16:9</Display_aspect_ratio>'
+    '<Frame_rate_mode>Constant</Frame_rate_mode><Frame_rate>23.976</Frame_rate><FrameRate_Num>24000</FrameRate_Num>'
+    '<FrameRate_Den>1001</FrameRate_Den><Color_space>YUV</Color_space><Chroma_subsampling>4:2:0</Chroma_subsampling>'
+    '<Bit_depth>8</Bit_depth><Scan_type>Progressive</Scan_type><Language>en</Language><Default>Yes</Default></track>'
+    + "".join(
+        f'<track type="Audio"><Track_ID>{2 + i}</Track_ID><StreamOrder>{1 + i}</StreamOrder><Format>AAC</Format>'
+        '<Format_profile>LC</Format_profile><Bit_rate>128000</Bit_rate><Bit_rate>128 kb/s</Bit_rate>'
+        '<Bit_rate_mode>Constant</Bit_rate_mode><Channel_s_>2</Channel_s_><Channel_layout>L R</Channel_layout>'
+        f'<Sampling_rate>48000</Sampling_rate><Language>{language}</Language></track>'
+        for i, language in enumerate(("en", "es"))
+    )
+    + "".join(
+        f'<track type="Text"><Track_ID>{4 + i}</Track_ID><StreamOrder>{3 + i}</StreamOrder><Format>UTF-8</Format>'
+        f'<Bit_rate>80</Bit_rate><Bit_rate>80 b/s</Bit_rate><Language>{language}</Language>'
+        f'<Forced>{"Yes" if forced else "No"}</Forced></track>'
+        for i, (language, forced) in enumerate((("en", False), ("es", False), ("fr", True)))
+    )
+    + '</File></Mediainfo>'
+)
+
+
+class SyntheticTitle(dict):
+    """Synthetic IMDb title supporting both the `{imdb[title]}` and `{imdb.movieID}` lookups of a cinemagoer Movie."""
+    movieID = "0000000"
+
+
+class TemplateProfile(NamedTuple):
+    """The result of `profile_template`."""
+    iterations: int
+    seconds: float  # total time of every render
+    formats: FormatProfile
+
+    def rows(self, stats: Dict[str, List[float]]) -> List[Tuple[str, int, float, float]]:
+        """Get the (name, calls per render, ms per render, share of the render time) of each entry, slowest first."""
+        return sorted((
+            (name, int(calls // self.iterations), seconds * 1000 / self.iterations, seconds / self.seconds)
+            for name, (calls, seconds) in stats.items()
+        ), key=lambda x: x[2], reverse=True)
+
+
+def get_synthetic_variables() -> Dict[str, Any]:
+    """
+    Get a synthetic NFO context of an episode of a season release, with every variable of an NFO.
+    Used to profile templates without a release, the values are representative but not real.
+    """
+    file = Path("Synthetic.Release.S01.1080p.WEB-DL.AAC2.0.H.264") / "Synthetic.Release.S01E01.1080p.WEB-DL.mkv"
+    media_info = MediaInfo(SYNTHETIC_MEDIA_INFO)
+    chapters = {f"00.{i * 4:02}.00.000": f"Chapter {i + 1}" for i in range(12)}
+    images = [
+        {"url": f"https://imgbox.com/Synth{i:03}", "src": f"https://thumbs2.imgbox.com/aa/bb/Synth{i:03}_t.png"}
+        for i in range(4)
+    ]
+    return dict(
+        file=file,
+        imdb=SyntheticTitle({
+            "title": "Synthetic Release",
+            "year": 2020,
+            "series years": "2020-2022",
+            "kind": "tv series",
+            "rating": 8.1,
+            "genres": ["Animation", "Comedy"],
+            "plot outline": "A synthetic title, used to profile templates without a release. " * 6
+        }),
+        imdb_id="tt0000000",
+        tmdb="tv/0",
+        tvdb=0,
+        source="Synthetic 1080p WEB-DL",
+        note="A synthetic note, long enough to be wrapped over a few lines of the template. " * 3,
+        preview="https://imgbox.com/g/Synthetic",
+        season=1,
+        episode=1,
+        episode_name="Pilot",
+        episodes=12,
+        season_info=SeasonInfo(
+            files=[f"Synthetic.Release.S01E{i:02}.1080p.WEB-DL.mkv" for i in range(1, 13)],
+            size=12 * 1024 ** 3,
+            episodes=list(range(1, 13)),
+            gaps=[]
+        ),
+        language="English",
+        videos=[Video(x, file) for x in media_info.video_tracks],
+        audio=[Audio(x, file) for x in media_info.audio_tracks],
+        subtitles=[Subtitle(x, file) for x in media_info.text_tracks],
+        videos_pretty=[[
+            "- English, AVC (High@L4.0) 1920x1080 (16:9) @ 6 000 kb/s (Variable)",
+            "  23.976 FPS (Constant), YUV 4:2:0 8bps, SDR, Progressive"
+        ]],
+        audio_pretty=[
+            "- English, AAC LC 2.0 @ 128 kb/s (Constant)",
+            "- Spanish, AAC LC 2.0 @ 128 kb/s (Constant)"
+        ],
+        subtitles_pretty=["- English, SubRip (SRT)", "- Spanish, SubRip (SRT)", "- French, Forced, SubRip (SRT)"],
+        chapters=chapters,
+        chapters_numbered=True,
+        chapters_named=False,
+        chapters_yes_no="Yes (Numbered 01-12)",
+        chapter_entries=[f"- {k}: {v}" for k, v in chapters.items()],
+        scan_entries=["--"],
+        banner_image="https://assets.fanart.tv/fanart/tv/0/tvbanner/synthetic.jpg",
+        preview_images=images
+    )
+
+
+def profile_template(template: str, variables: Dict[str, Any], art: Optional[str] = None,
+                     iterations: int = 20) -> TemplateProfile:
+    """
+    Render a template, wrapped in art if provided, repeatedly, timing each field and format spec.
+    The template is rendered once beforehand, so it's already compiled and the time is only spent rendering.
+    """
+    CustomFormats().format(art or "{nfo}", nfo=CustomFormats().format(template, **variables))
+
+    profile = FormatProfile()
+    formatter = CustomFormats(profile)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        nfo = formatter.format(template, **variables)
+        if art:
+            formatter.format(art, nfo=nfo)
+    return TemplateProfile(iterations, time.perf_counter() - start, profile)
@@ -0,0 +1,103 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, NamedTuple
+
+hooks: List[Callable[["Span"], None]] = []  # called with every finished span, see `add_hook`
+
+_local = threading.local()
+
+
+class Span(NamedTuple):
+    """A named, timed phase of work, e.g., the MediaInfo parse or the IMDb lookup."""
+    name: str
+    start: float  # wall-clock time the span started at, in seconds since the epoch
+    duration: float  # in seconds
+    depth: int  # amount of spans it was nested within on the same thread
+    thread: str
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round(self.duration * 1000, 3),
+            "depth": self.depth,
+            "thread": self.thread
+        })
+
+
+def add_hook(hook: Callable[[Span], None]) -> None:
+    """
+    Call a function with every span as it finishes, e.g., to forward them to a metrics pipeline.
+    Hooks are called on the thread that ran the span, so they should be quick and thread-safe.
+    """
+    hooks.append(hook)
+
+
+def remove_hook(hook: Callable[[Span], None]) -> None:
+    """Stop calling a function added with `add_hook`."""
+    if hook in hooks:
+        hooks.remove(hook)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """
+    Time the enclosed code as a named span, passing it to each hook once it finishes, even if it raised.
+    Does nothing if no hooks are added.
+
+    Example:
+        >>> with span("imdb"):
+        ...     movie = get_movie()
+    """
+    if not hooks:
+        yield
+        return
+    depth = getattr(_local, "depth", 0)
+    _local.depth = depth + 1
+    start = time.time()
+    counter = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - counter
+        _local.depth = depth
+        finished = Span(name, start, duration, depth, threading.current_thread().name)
+        for hook in list(hooks):
+            hook(finished)
+
+
+class SpanRecorder:
+    """Hook that keeps every span it's called with, for reporting them once done."""
+    def __init__(self) -> None:
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, span_: Span) -> None:
+        with self._lock:
+            self.spans.append(span_)
+
+    def __enter__(self) -> "SpanRecorder":
+        add_hook(self)
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        remove_hook(self)
+
+    def to_json_lines(self) -> str:
+        """Get each span as a line of JSON, in the order they started."""
+        return "\n".join(x.to_json() for x in sorted(self.spans, key=lambda x: x.start))
+
+    def summary(self) -> str:
+        """Get a table of the amount of calls and the total time of each span name, by total time."""
+        totals: Dict[str, List[float]] = {}
+        for x in self.spans:
+            totals.setdefault(x.name, []).append(x.duration)
+        rows = sorted(totals.items(), key=lambda x: sum(x[1]), reverse=True)
+        width = max([len("span")] + [len(name) for name in totals])
+        lines = [f"{'span':<{width}} {'calls':>5} {'total':>11} {'max':>11}"]
+        for name, durations in rows:
+            total, longest = sum(durations) * 1000, max(durations) * 1000
+            lines.append(f"{name:<{width}} {len(durations):>5} {total:>8.2f} ms {longest:>8.2f} ms")
+        return "\n".join(lines)
@@ -5,10 +5,19 @@ from typing import Optional
 
 import pymediainfo
 
-from pynfogen.tracks.BaseTrack import BaseTrack
+from pynfogen.helpers import cached_property
+from pynfogen.tracks.BaseTrack import BaseTrack, TrackData
+
+
+class AudioData(TrackData):
+    __slots__ = (
+        "format_additionalfeatures", "commercial_name", "channel_s", "channel_layout", "sampling_rate",
+        "compression_mode"
+    )
 
 
 class Audio(BaseTrack):
+    DATA = AudioData
     AUDIO_CHANNEL_LAYOUT_WEIGHT = {
         "LFE": 0.1
     }
@@ -16,7 +25,7 @@ class Audio(BaseTrack):
     def __init__(self, track: pymediainfo.Track, path: Path):
         super().__init__(track, path)
 
-    @property
+    @cached_property
     def codec(self) -> str:
         """
         Get track codec in common P2P simplified form.
@@ -27,7 +36,7 @@ class Audio(BaseTrack):
             "AC-3": "DD"
         }.get(self._x.format, self._x.format)
 
-    @property
+    @cached_property
     def channels(self) -> float:
         """Get track channels as channel layout representation."""
         if self._x.channel_layout:
@@ -37,7 +46,7 @@ class Audio(BaseTrack):
             ))
         return float(self._x.channel_s)
 
-    @property
+    @cached_property
     def title(self) -> Optional[str]:
         """
         Get track title in it's simplest form.
@@ -1,17 +1,82 @@
 from __future__ import annotations
 
-from collections import defaultdict
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Dict, Iterator, Mapping, Optional, Type
 
 import pymediainfo
-from langcodes import Language
+
+from pynfogen.helpers import cached_property
+from pynfogen.languages import get_display_name
+
+
+class TrackProperties(Mapping[str, Any]):
+    """
+    Immutable snapshot of a track's properties.
+    Like a defaultdict, properties that do not exist are None, so templates may use any property name.
+    """
+    __slots__ = ("_data",)
+
+    def __init__(self, data: Dict[str, Any]):
+        self._data = data
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data.get(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._data!r})"
+
+
+class TrackData:
+    """
+    Compact copy of the fields of a PyMediaInfo Track instance that are used by pynfogen.
+    Like PyMediaInfo, fields that do not exist or were not copied are None.
+
+    Subclasses add the fields specific to their track type to `__slots__`.
+    """
+    __slots__ = (
+        "track_type", "track_id", "streamorder", "format", "format_profile", "codec_id", "title", "language",
+        "default", "forced", "duration", "bit_rate", "other_bit_rate", "bit_rate_mode", "stream_size"
+    )
+
+    def __init__(self, track: pymediainfo.Track):
+        for name in self.fields():
+            setattr(self, name, getattr(track, name))
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return None
+
+    @classmethod
+    def fields(cls) -> Iterator[str]:
+        """Get the names of all fields copied by this class, including those of base classes."""
+        for klass in reversed(cls.__mro__):
+            yield from getattr(klass, "__slots__", ())
+
+    def to_data(self) -> Dict[str, Any]:
+        """Get the copied fields as a dictionary, like `pymediainfo.Track.to_data`."""
+        return {name: getattr(self, name) for name in self.fields()}
 
 
 class BaseTrack:
-    """Track to aide in overriding properties of a PyMediaInfo Track instance."""
+    """
+    Track to aide in overriding properties of a PyMediaInfo Track instance.
+    Only the fields listed by the DATA class are kept from the PyMediaInfo Track, so the full
+    MediaInfo parse can be released once the tracks are created.
+    """
+    DATA: Type[TrackData] = TrackData
+
     def __init__(self, track: pymediainfo.Track, path: Path):
-        self._x = track
+        self._x = self.DATA(track)
         self._path = path
         # common shorthands
         self.bitrate = self._x.other_bit_rate[0]
@@ -19,33 +84,46 @@ class BaseTrack:
     def __getattr__(self, name: str) -> Any:
         return getattr(self._x, name)
 
-    @property
-    def all_properties(self) -> defaultdict[str, Any]:
-        """Get all non-callable attributes from this and it's sub-track object."""
-        props = defaultdict(lambda: None)
+    @cached_property
+    def all_properties(self) -> TrackProperties:
+        """
+        Get all non-callable attributes from this and it's sub-track object.
+        Every property is evaluated once, on first access, and the result is an immutable snapshot.
+        """
+        props: Dict[str, Any] = {}
 
-        for obj in (self, self._x):
-            for k, v in obj.__dict__.items():
-                if k in ("_x", "_path"):
-                    continue
-                props[k] = v
+        for k, v in self.__dict__.items():
+            if k in ("_x", "_path", "all_properties"):
+                continue
+            props[k] = v
+        props.update(self._x.to_data())
 
         for subclass in (BaseTrack, self.__class__):
             for k, v in vars(subclass).items():
-                if not isinstance(v, property):
+                if not isinstance(v, (property, cached_property)):
                     continue
                 if k in ("all_properties",):
                     continue
                 props[k] = getattr(self, k)
 
-        return props
+        return TrackProperties(props)
+
+    @cached_property
+    def language_code(self) -> Optional[str]:
+        """
+        Get the MediaInfo language code, e.g., 'en' or 'es-419'.
+        Returns None if no language is specified.
+        """
+        if self._x.language and self._x.language != "und":
+            return self._x.language
+        return None
 
-    @property
+    @cached_property
     def language(self) -> Optional[str]:
         """
         Override MediaInfo language with English Display Name.
         Returns None if no language is specified.
         """
         if self._x.language and self._x.language != "und":
-            return Language.get(self._x.language).display_name("en")
+            return get_display_name(self._x.language)
         return None
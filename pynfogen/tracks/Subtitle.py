@@ -4,6 +4,7 @@ from pathlib import Path
 
 import pymediainfo
 
+from pynfogen.helpers import cached_property
 from pynfogen.tracks.BaseTrack import BaseTrack
 
 
@@ -11,7 +12,7 @@ class Subtitle(BaseTrack):
     def __init__(self, track: pymediainfo.Track, path: Path):
         super().__init__(track, path)
 
-    @property
+    @cached_property
     def codec(self) -> str:
         """
         Get track codec in common P2P simplified form.
@@ -21,7 +22,7 @@ class Subtitle(BaseTrack):
             "UTF-8": "SubRip (SRT)",
         }.get(self._x.format, self._x.format)
 
-    @property
+    @cached_property
     def title(self) -> str:
         """
         Get track title in it's simplest form.
@@ -1,14 +1,30 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Dict, Tuple
 
 import pymediainfo
-from pyd2v import D2V
 
-from pynfogen.tracks.BaseTrack import BaseTrack
+from pynfogen.cache import Cache, file_key
+from pynfogen.helpers import cached_property
+from pynfogen.scan import ScanStats, get_scan_stats
+from pynfogen.timing import span
+from pynfogen.tracks.BaseTrack import BaseTrack, TrackData
+
+scan_cache = Cache("scan_cells")
+
+
+class VideoData(TrackData):
+    __slots__ = (
+        "format_version", "width", "height", "display_aspect_ratio", "other_display_aspect_ratio",
+        "frame_rate", "frame_rate_mode", "framerate_num", "framerate_den", "color_space", "chroma_subsampling",
+        "bit_depth", "scan_type", "hdr_format", "color_primaries", "matrix_coefficients",
+        "transfer_characteristics", "transfer_characteristics_original", "writing_library"
+    )
 
 
 class Video(BaseTrack):
+    DATA = VideoData
     DYNAMIC_RANGE_MAP = {
         "SMPTE ST 2086": "HDR10",
         "HDR10": "HDR10",
@@ -27,7 +43,7 @@ class Video(BaseTrack):
         else:
             self.fps = self._x.frame_rate
 
-    @property
+    @cached_property
     def codec(self) -> str:
         """
         Get video codec in common P2P simplified form.
@@ -37,7 +53,7 @@ class Video(BaseTrack):
             "MPEG Video": f"MPEG-{(self._x.format_version or '').replace('Version ', '')}"
         }.get(self._x.format, self._x.format)
 
-    @property
+    @cached_property
     def range(self) -> str:
         """
         Get video range as typical shortname.
@@ -53,11 +69,11 @@ class Video(BaseTrack):
             return "HLG"
         return "SDR"
 
-    @property
+    @cached_property
     def scan(self) -> str:
         """
         Get video scan type in string form.
-        Will accurately check using DGIndex if codec is MPEG-1/2.
+        Will accurately check using DGIndex if codec is MPEG-1/2, see `scan_cells`.
 
         Examples:
             'Interlaced'
@@ -68,28 +84,37 @@ class Video(BaseTrack):
             '99.78% Progressive (VST)'
             '0.01% Interlaced (VST)'
         """
+        if self.scan_cells:
+            return sum(self.scan_cells.values(), ScanStats(0, 0)).scan_type
+
         scan_type = self._x.scan_type
         if not scan_type:
             # some videos may not state scan, presume progressive
             scan_type = "Progressive"
 
-        if self.codec in ["MPEG-1", "MPEG-2"]:
-            d2v = D2V.load(self._path)
-            for ext in ("log", "d2v", "mpg", "mpeg"):
-                d2v.path.with_suffix(f".{ext}").unlink(missing_ok=True)
-
-            flags = [
-                dict(**flag, vob=d["vob"], cell=d["cell"])
-                for d in d2v.data
-                for flag in d["flags"]
-            ]
-            progressive_frames = sum(f["progressive_frame"] for f in flags)
-            progressive_percent = (progressive_frames / len(flags)) * 100
-            is_constant = progressive_percent in (0.0, 100.0)
-
-            scan_type = ["Interlaced", "Progressive"][progressive_percent >= 50.0]
-            scan_type += f" ({['VST', 'CST'][is_constant]})"
-            if not is_constant:
-                scan_type = f"{progressive_percent:.2f}% {scan_type}"
-
         return scan_type
+
+    @cached_property
+    def scan_cells(self) -> Dict[Tuple[int, int], ScanStats]:
+        """
+        Get progressive frame statistics of each cell by VOB ID and Cell ID, using DGIndex.
+        Only available if codec is MPEG-1/2, otherwise empty. The result is cached by file
+        path, size, and modification time, as indexing can take minutes per file.
+        """
+        if self.codec not in ["MPEG-1", "MPEG-2"]:
+            return {}
+        key = file_key(self._path)
+        cells = scan_cache.get(key)
+        if cells is None:
+            with span("video.d2v_scan"):
+                cells = get_scan_stats(self._path)
+            scan_cache.set(key, cells)
+        return cells
+
+    @cached_property
+    def scan_vobs(self) -> Dict[int, ScanStats]:
+        """Get progressive frame statistics of each VOB by VOB ID, see `scan_cells`."""
+        vobs: Dict[int, ScanStats] = {}
+        for (vob, _), stats in self.scan_cells.items():
+            vobs[vob] = vobs.get(vob, ScanStats(0, 0)) + stats
+        return vobs